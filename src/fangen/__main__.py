@@ -1,26 +1,31 @@
+import enum
 import logging
 from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import typer
-from requests import Session
 from rich import print
 from rich.logging import RichHandler
 
-from fangen.config import Config, load_config
-from fangen.cosplay2.client import Cosplay2Client
-from fangen.db.factory import get_session
-from fangen.db.update_db import make_db
-from fangen.excel.update_data import make_data
-from fangen.excel.update_plan import make_plan
-from fangen.files.download_files import download_files
-from fangen.files.move_files import move_files
+if TYPE_CHECKING:
+    from fangen.config import Config
+
+# Every command imports what it needs when it runs: adaptix, SQLAlchemy,
+# openpyxl, requests and especially yt-dlp are slow to import, and most
+# commands need only some of them. `python -m fangen.bench.startup` keeps an
+# eye on this.
 
 app = typer.Typer()
 
 
+class DataFormat(enum.StrEnum):
+    XLSX = "xlsx"
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
 def print_logo() -> None:
     print("""███████╗ █████╗ ███╗   ██╗ ██████╗ ███████╗███╗   ██╗""")
     print("""██╔════╝██╔══██╗████╗  ██║██╔════╝ ██╔════╝████╗  ██║""")
@@ -30,6 +35,15 @@ def print_logo() -> None:
     print("""╚═╝     ╚═╝  ╚═╝╚═╝  ╚═══╝ ╚═════╝ ╚══════╝╚═╝  ╚═══╝""")
 
 
+def finish_profile(json_path: Path | None) -> None:
+    from fangen.common.profiling import profile
+
+    print(profile.table())
+    if json_path is not None:
+        profile.write_json(json_path)
+        print(f"⏱️ Профиль сохранён в {json_path.absolute()}")
+
+
 @app.callback()
 def main(
     ctx: typer.Context,
@@ -47,62 +61,231 @@ def main(
             help="Путь к конфигу",
         ),
     ] = Path("./config.toml"),
+    *,
+    profile_run: Annotated[
+        bool,
+        typer.Option(
+            "--profile",
+            help=(
+                "Замерить время и пиковую память этапов, SQL- и HTTP-запросы "
+                "и вывести сводку в конце"
+            ),
+        ),
+    ] = False,
+    profile_json: Annotated[
+        Path | None,
+        typer.Option(
+            "--profile-json",
+            dir_okay=False,
+            help="Дополнительно сохранить профиль в JSON-файл (включает --profile)",
+        ),
+    ] = None,
 ) -> None:
     logging.basicConfig(
         level=logging.INFO, handlers=[RichHandler(rich_tracebacks=True)]
     )
+    from fangen.config import ConfigError, load_config
+
     print_logo()
-    loaded_config = load_config(config)
+    if profile_run or profile_json is not None:
+        from fangen.common.profiling import profile
+
+        profile.start()
+        ctx.call_on_close(lambda: finish_profile(profile_json))
+    try:
+        loaded_config = load_config(config)
+    except ConfigError as e:
+        raise typer.BadParameter(str(e), param_hint="--config") from e
     ctx.obj = SimpleNamespace(config=loaded_config)
 
 
 @app.command(name="make_db", help="Загружает данные из заявок с Cosplay2")
-def make_db_command(ctx: typer.Context) -> None:
+def make_db_command(
+    ctx: typer.Context,
+    *,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            "-i",
+            help=(
+                "Обновить существующую базу: перезаписываются только новые, "
+                "изменённые и удалённые заявки"
+            ),
+        ),
+    ] = False,
+    offline: Annotated[
+        bool,
+        typer.Option(
+            "--offline",
+            help=("Собрать базу из кэша ответов (cache_dir) без обращения к Cosplay2"),
+        ),
+    ] = False,
+) -> None:
+    from requests import Session
+
+    from fangen.cosplay2.cache import ResponseCache
+    from fangen.cosplay2.client import Cosplay2Client
+    from fangen.cosplay2.transport import Transport
+    from fangen.db.update_db import make_db
+
     config: Config = ctx.obj.config
+    cache = (
+        ResponseCache(config.cache_dir / config.event_name)
+        if config.cache_dir is not None
+        else None
+    )
+    if offline and cache is None:
+        msg = "для работы без сети укажите cache_dir в конфиге"
+        raise typer.BadParameter(msg, param_hint="--offline")
+    transport = Transport(
+        Session(),
+        # make_db runs api_concurrency pool workers while the values stream in
+        # on the main thread, so one more connection is in use at a time.
+        pool_size=config.api_concurrency + 1,
+        rate_limit=config.api_rate_limit,
+        max_retries=config.api_max_retries,
+    )
     client = Cosplay2Client(
-        session=Session(),
+        transport=transport,
         api_key=config.api_key,
         api_secret=config.api_secret,
         event_name=config.event_name,
+        base_url=config.api_base_url,
+        cache=cache,
+        offline=offline,
+    )
+    make_db(
+        client=client,
+        db_path=config.db_path,
+        incremental=incremental,
+        concurrency=config.api_concurrency,
     )
-    make_db(client=client, db_path=config.db_path)
+    if transport.stats:
+        print(transport.stats_table())
 
 
 @app.command(name="make_plan", help="Заполняет план данными из заявок")
 def make_plan_command(
     ctx: typer.Context,
-    filepath: Annotated[Path, typer.Argument(help="Путь к файлу Excel")] = Path(
-        "./plan.xlsx"
-    ),
+    filepaths: Annotated[
+        list[Path] | None,
+        typer.Argument(
+            help=("Пути к файлам плана (можно несколько). По умолчанию ./plan.xlsx"),
+            show_default=False,
+        ),
+    ] = None,
+    *,
+    update: Annotated[
+        bool,
+        typer.Option(
+            "--update",
+            "-u",
+            help=(
+                "Обновить строки на месте: сопоставить их с расписанием по uid "
+                "и записать только изменившиеся ячейки. В лист без столбца {uid} "
+                "он добавляется, а заполненные ранее строки сопоставляются по "
+                "значениям столбцов-шаблонов"
+            ),
+        ),
+    ] = False,
 ) -> None:
+    from fangen.db.factory import get_session
+    from fangen.excel.update_plan import make_plan
+
     config: Config = ctx.obj.config
-    session = get_session(db_path=config.db_path)
-    make_plan(filepath=filepath, session=session)
+    session = get_session(db_path=config.db_path, read_only=True)
+    make_plan(
+        filepaths=filepaths or [Path("./plan.xlsx")], session=session, update=update
+    )
 
 
-@app.command(name="make_data", help="Экспортирует данные заявок в Excel-файл")
+@app.command(
+    name="make_data", help="Экспортирует данные заявок в Excel-, CSV- или JSONL-файл"
+)
 def make_data_command(
     ctx: typer.Context,
     filepath: Annotated[
         Path | None,
         typer.Argument(
             help=(
-                "Путь к файлу Excel. По умолчанию — снимок данных с меткой "
+                "Путь к файлу. По умолчанию — снимок данных с меткой "
                 "даты и времени, например ./data_2026-08-11T1430.xlsx"
             )
         ),
     ] = None,
+    *,
+    output_format: Annotated[
+        DataFormat,
+        typer.Option(
+            "--format",
+            "-f",
+            help=(
+                "Формат файла. csv и jsonl содержат только сводный список и "
+                "выгружаются потоком, заявка за заявкой"
+            ),
+        ),
+    ] = DataFormat.XLSX,
+    split: Annotated[
+        bool,
+        typer.Option(
+            "--split",
+            help=(
+                "Сохранить в файл только сводный лист, а каждый раздел — "
+                "отдельным файлом в папке с тем же именем"
+            ),
+        ),
+    ] = False,
+    workers: Annotated[
+        int | None,
+        typer.Option(
+            min=1,
+            help=(
+                "Сколько файлов разделов собирать параллельно (--split). "
+                "По умолчанию — по числу ядер"
+            ),
+        ),
+    ] = None,
 ) -> None:
+    from fangen.db.factory import get_session
+
     config: Config = ctx.obj.config
+    if split and output_format is not DataFormat.XLSX:
+        msg = "разбить на файлы по разделам можно только выгрузку в xlsx"
+        raise typer.BadParameter(msg, param_hint="--split")
     if filepath is None:
         # The export is a point-in-time snapshot, so by default we stamp the
         # filename with an ISO 8601 date and time (omitting ":", which is
         # invalid in Windows filenames). This keeps snapshots from overwriting
         # each other and sorts them chronologically by name.
         timestamp = datetime.now().astimezone().strftime("%Y-%m-%dT%H%M")
-        filepath = Path(f"./data_{timestamp}.xlsx")
-    session = get_session(db_path=config.db_path)
-    make_data(filepath=filepath, session=session, config=config)
+        filepath = Path(f"./data_{timestamp}.{output_format}")
+    session = get_session(db_path=config.db_path, read_only=True)
+    if output_format is not DataFormat.XLSX:
+        from fangen.excel.flat import make_flat_data
+
+        make_flat_data(filepath=filepath, session=session, output_format=output_format)
+        return
+
+    from fangen.excel.update_data import make_data
+
+    make_data(
+        filepath=filepath,
+        session=session,
+        config=config,
+        split=split,
+        workers=workers,
+    )
+
+
+@app.command(name="stats", help="Выводит сводку по одобренным заявкам")
+def stats_command(ctx: typer.Context) -> None:
+    from fangen.db.factory import get_session
+    from fangen.db.stats import print_stats
+
+    config: Config = ctx.obj.config
+    session = get_session(db_path=config.db_path, read_only=True)
+    print_stats(session=session)
 
 
 @app.command(name="download_files", help="Скачивает файлы заявок")
@@ -112,8 +295,11 @@ def download_files_command(
         "./files"
     ),
 ) -> None:
+    from fangen.db.factory import get_session
+    from fangen.files.download_files import download_files
+
     config: Config = ctx.obj.config
-    session = get_session(db_path=config.db_path)
+    session = get_session(db_path=config.db_path, read_only=True)
     output_dir.mkdir(exist_ok=True, parents=True)
     download_files(output_dir=output_dir, session=session, config=config)
 
@@ -128,8 +314,11 @@ def move_files_command(
         "./stage"
     ),
 ) -> None:
+    from fangen.db.factory import get_session
+    from fangen.files.move_files import move_files
+
     config: Config = ctx.obj.config
-    session = get_session(db_path=config.db_path)
+    session = get_session(db_path=config.db_path, read_only=True)
     output_dir.mkdir(exist_ok=True, parents=True)
     move_files(
         input_dir=input_dir, output_dir=output_dir, session=session, config=config
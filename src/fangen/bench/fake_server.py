@@ -0,0 +1,286 @@
+import contextlib
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path  # noqa: TC003 - typer reads the annotations at runtime
+from typing import TYPE_CHECKING, Annotated, cast
+
+import typer
+from adaptix import Retort
+from rich import print
+from rich.table import Table
+
+from fangen.bench.synthetic import generate_event
+from fangen.cosplay2.cache import ResponseCache
+from fangen.cosplay2.models.plan import PlanNodeDTO
+from fangen.cosplay2.models.request import RequestDTO
+from fangen.cosplay2.models.topic import TopicDTO, TopicWithFieldsDTO
+from fangen.cosplay2.models.value import RequestValueDTO
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fangen.bench.synthetic import SyntheticEvent
+
+API_PREFIX = "/api/"
+
+# Bytes written per socket call, and so the granularity of the bandwidth limit.
+WRITE_CHUNK_SIZE = 16 * 1024
+
+# Responses the server can fail with when an error is injected.
+ERROR_STATUSES = (
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Faults:
+    """What the fake server does to every response besides serving it."""
+
+    latency: float = 0.0  # seconds before the response headers
+    jitter: float = 0.0  # up to this many seconds added to the latency
+    bandwidth: int | None = None  # bytes per second per connection
+    error_rate: float = 0.0  # share of calls answered with a 5xx
+    throttle_rate: float = 0.0  # share of calls answered with a 429
+    retry_after: int | None = None  # Retry-After of a 429, in seconds
+
+
+@dataclass(slots=True)
+class ServerStats:
+    ok: int = 0
+    not_modified: int = 0
+    throttled: int = 0
+    errors: int = 0
+    not_found: int = 0
+    bytes_sent: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, name: str, count: int = 1) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + count)
+
+
+def synthetic_bodies(event: SyntheticEvent) -> dict[str, bytes]:
+    """Bodies of the five Cosplay2 endpoints, by cache key, for ``event``."""
+    retort = Retort()
+
+    def dump(data: object, data_type: object) -> bytes:
+        return json.dumps(retort.dump(data, data_type), ensure_ascii=False).encode()
+
+    # The plan is a JSON document embedded as a string, as Cosplay2 sends it.
+    plan = json.dumps(retort.dump(event.plan, list[PlanNodeDTO]), ensure_ascii=False)
+    bodies = {
+        ResponseCache.key("topics/get_list"): dump(event.topics, list[TopicDTO]),
+        ResponseCache.key("events/get_plan"): dump({"plan": plan}, dict[str, str]),
+        ResponseCache.key("topics/get_all_requests"): dump(
+            event.requests, list[RequestDTO]
+        ),
+        ResponseCache.key("requests/get_all_values"): dump(
+            event.values, list[RequestValueDTO]
+        ),
+    }
+    for with_fields in event.topics_with_fields:
+        key = ResponseCache.key(
+            "topics/get_with_fields", {"topic_url_code": with_fields.topic.url_code}
+        )
+        bodies[key] = dump(with_fields, TopicWithFieldsDTO)
+    return bodies
+
+
+def recorded_bodies(directory: Path) -> Callable[[str], bytes | None]:
+    """Bodies cached by ``make_db`` (``cache_dir/event_name``), read on demand."""
+    cache = ResponseCache(directory)
+
+    def body(key: str) -> bytes | None:
+        path = cache.directory / f"{key}.json"
+        return path.read_bytes() if path.exists() else None
+
+    return body
+
+
+class FakeCosplay2Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so that connection pooling in the client matters as it does
+    # against the real server.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:
+        self._serve(None)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        self._serve(json.loads(raw) if raw else None)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        server = cast("FakeCosplay2Server", self.server)
+        bandwidth = server.faults.bandwidth
+        for start in range(0, len(body), WRITE_CHUNK_SIZE):
+            chunk = body[start : start + WRITE_CHUNK_SIZE]
+            self.wfile.write(chunk)
+            if bandwidth:
+                time.sleep(len(chunk) / bandwidth)
+        server.stats.add("bytes_sent", len(body))
+
+    def _serve(self, payload: dict[str, object] | None) -> None:
+        server = cast("FakeCosplay2Server", self.server)
+        faults = server.faults
+        time.sleep(faults.latency + server.rng.uniform(0, faults.jitter))
+
+        roll = server.rng.random()
+        if roll < faults.throttle_rate:
+            server.stats.add("throttled")
+            headers = {}
+            if faults.retry_after is not None:
+                headers["Retry-After"] = str(faults.retry_after)
+            self._send(HTTPStatus.TOO_MANY_REQUESTS, headers=headers)
+            return
+        if roll < faults.throttle_rate + faults.error_rate:
+            server.stats.add("errors")
+            self._send(server.rng.choice(ERROR_STATUSES))
+            return
+
+        endpoint = self.path.split("?", 1)[0].removeprefix(API_PREFIX)
+        body = server.body(ResponseCache.key(endpoint, payload))
+        if body is None:
+            server.stats.add("not_found")
+            self._send(HTTPStatus.NOT_FOUND)
+            return
+
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if self.headers.get("If-None-Match") == etag:
+            server.stats.add("not_modified")
+            self._send(HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+            return
+        server.stats.add("ok")
+        self._send(
+            HTTPStatus.OK,
+            body,
+            headers={"Content-Type": "application/json", "ETag": etag},
+        )
+
+
+class FakeCosplay2Server(ThreadingHTTPServer):
+    """A local stand-in for the Cosplay2 API with injectable faults.
+
+    Serves the endpoints ``Cosplay2Client`` calls, with bodies looked up by
+    their ``ResponseCache`` key, so both a synthetic event and the cache of
+    a real ``make_db`` run can be replayed.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        body: Callable[[str], bytes | None],
+        faults: Faults,
+        seed: int = 0,
+    ) -> None:
+        super().__init__(address, FakeCosplay2Handler)
+        self.body = body
+        self.faults = faults
+        self.stats = ServerStats()
+        # Reproducible fault injection, not security-sensitive.
+        self.rng = random.Random(seed)  # noqa: S311
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def stats_table(self) -> Table:
+        table = Table(title="🧪 Ответы тестового сервера")
+        table.add_column("Ответ")
+        table.add_column("Количество", justify="right")
+        for title, value in (
+            ("200 OK", self.stats.ok),
+            ("304 Not Modified", self.stats.not_modified),
+            ("429 Too Many Requests", self.stats.throttled),
+            ("5xx", self.stats.errors),
+            ("404 Not Found", self.stats.not_found),
+            ("Отправлено, МБ", f"{self.stats.bytes_sent / 1024 / 1024:.1f}"),
+        ):
+            table.add_row(title, str(value))
+        return table
+
+
+def main(
+    *,
+    host: Annotated[str, typer.Option(help="Адрес для входящих соединений")] = (
+        "127.0.0.1"
+    ),
+    port: Annotated[int, typer.Option(help="Порт")] = 8000,
+    requests: Annotated[
+        int, typer.Option(help="Сколько заявок сгенерировать")
+    ] = 10_000,
+    seed: Annotated[int, typer.Option(help="Зерно генератора и сбоев")] = 0,
+    recorded: Annotated[
+        Path | None,
+        typer.Option(
+            exists=True,
+            file_okay=False,
+            help=(
+                "Отдавать ответы из кэша события (cache_dir/event_name) "
+                "вместо сгенерированных"
+            ),
+        ),
+    ] = None,
+    latency: Annotated[
+        float, typer.Option(help="Задержка перед каждым ответом, с")
+    ] = 0.0,
+    jitter: Annotated[
+        float, typer.Option(help="Случайная добавка к задержке, до стольких с")
+    ] = 0.0,
+    bandwidth: Annotated[
+        int | None,
+        typer.Option(help="Скорость отдачи на соединение, байт/с"),
+    ] = None,
+    error_rate: Annotated[float, typer.Option(help="Доля ответов с ошибкой 5xx")] = 0.0,
+    throttle_rate: Annotated[float, typer.Option(help="Доля ответов 429")] = 0.0,
+    retry_after: Annotated[
+        int | None, typer.Option(help="Заголовок Retry-After в ответах 429, с")
+    ] = None,
+) -> None:
+    """Serve a fake Cosplay2 API until interrupted."""
+    if recorded is not None:
+        body = recorded_bodies(recorded)
+    else:
+        bodies = synthetic_bodies(generate_event(requests=requests, seed=seed))
+        body = bodies.get
+    faults = Faults(
+        latency=latency,
+        jitter=jitter,
+        bandwidth=bandwidth,
+        error_rate=error_rate,
+        throttle_rate=throttle_rate,
+        retry_after=retry_after,
+    )
+    with FakeCosplay2Server((host, port), body, faults, seed=seed) as server:
+        print(f"🧪 Тестовый сервер Cosplay2: {server.base_url}")
+        with contextlib.suppress(KeyboardInterrupt):
+            server.serve_forever()
+        print(server.stats_table())
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,102 @@
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated
+
+import typer
+from rich import print
+
+from fangen.bench.synthetic import FIELDS, generate_event
+from fangen.db.factory import create_db, get_session
+from fangen.db.ingest import (
+    insert_plan,
+    insert_requests,
+    insert_values,
+    request_event_ids,
+)
+from fangen.db.models import Request, RequestValue, Topic, TopicField, TopicSection
+from fangen.db.models.node import PlanNode
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.orm import Session
+
+    from fangen.bench.synthetic import SyntheticEvent
+    from fangen.cosplay2.models.plan import PlanNodeDTO
+
+
+def ingest_topics(session: Session, event: SyntheticEvent) -> None:
+    """Topics and their fields, written the same way `make_db` does."""
+    session.add_all([Topic.from_dto(topic) for topic in event.topics])
+    for with_fields in event.topics_with_fields:
+        session.add_all(
+            [TopicSection.from_dto(section) for section in with_fields.topic_sections]
+        )
+        session.add_all(
+            [TopicField.from_dto(field) for field in with_fields.topic_fields]
+        )
+
+
+def ingest_orm(session: Session, event: SyntheticEvent) -> None:
+    """The pre-bulk ingestion path: one ORM object per row, one flush per node."""
+    ingest_topics(session, event)
+    session.add_all([Request.from_dto(req) for req in event.requests])
+    session.flush()
+    session.add_all(RequestValue.from_dto(val) for val in event.values)
+    session.flush()
+
+    def proceed_node(node: PlanNodeDTO, parent_id: str | None = None) -> None:
+        node_orm = PlanNode.from_dto(node)
+        if parent_id:
+            node_orm.parent_id = parent_id
+        session.add(node_orm)
+        session.flush([node_orm])
+        if node.nodes:
+            for child_node in node.nodes:
+                proceed_node(child_node, node_orm.uid)
+
+    for node in event.plan:
+        proceed_node(node)
+
+
+def ingest_bulk(session: Session, event: SyntheticEvent) -> None:
+    ingest_topics(session, event)
+    insert_requests(session, event.requests)
+    insert_values(
+        session, event.values, request_event_ids(event.requests, event.topics)
+    )
+    insert_plan(session, event.plan)
+
+
+def _measure(
+    ingest: Callable[[Session, SyntheticEvent], None],
+    event: SyntheticEvent,
+    db_path: Path,
+) -> float:
+    create_db(db_path=db_path)
+    with get_session(db_path=db_path) as session:
+        started = time.perf_counter()
+        ingest(session, event)
+        session.commit()
+        return time.perf_counter() - started
+
+
+def main(
+    values: Annotated[
+        int, typer.Option(help="Сколько значений сгенерировать")
+    ] = 500_000,
+    seed: Annotated[int, typer.Option(help="Зерно генератора")] = 0,
+) -> None:
+    """Compare the ORM and bulk ingestion paths on a synthetic event."""
+    event = generate_event(requests=max(values // len(FIELDS), 1), seed=seed)
+    rows = len(event.requests) + len(event.values)
+    print(f"Заявок: {len(event.requests)}, значений: {len(event.values)}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, ingest in (("orm", ingest_orm), ("bulk", ingest_bulk)):
+            elapsed = _measure(ingest, event, Path(tmp) / f"{name}.db")
+            print(f"{name:>5}: {elapsed:7.2f} с, {rows / elapsed:10,.0f} строк/с")
+
+
+if __name__ == "__main__":
+    typer.run(main)
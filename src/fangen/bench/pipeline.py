@@ -0,0 +1,287 @@
+import contextlib
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, cast
+
+import typer
+from rich import print
+from rich.table import Table
+from sqlalchemy import select
+
+from fangen.bench.synthetic import SyntheticClient, generate_event
+from fangen.config import Config
+from fangen.db.factory import get_session
+from fangen.db.models import RequestFile
+from fangen.db.update_db import make_db
+from fangen.excel.update_data import make_data
+from fangen.excel.update_plan import make_plan
+from fangen.files.move_files import move_files
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fangen.bench.synthetic import SyntheticEvent
+    from fangen.cosplay2.client import Cosplay2Client
+
+BYTES_PER_MB = 1024 * 1024
+
+# Bumped whenever stages or the synthetic event change, so that results of
+# different suites are never compared with each other.
+RESULTS_VERSION = 1
+
+DEFAULT_SIZES = [1000, 10_000, 50_000]
+
+
+@dataclass(frozen=True, slots=True)
+class StageResult:
+    time: float
+    peak_memory: int
+
+
+class PipelineRun:
+    """One synthetic event and the working directory its stages share."""
+
+    def __init__(self, event: SyntheticEvent, workdir: Path) -> None:
+        self.event = event
+        self.workdir = workdir
+        self.db_path = workdir / "bench.db"
+        self.input_dir = workdir / "files"
+        self.output_dir = workdir / "stage"
+        self.config = Config(
+            api_key="",
+            api_secret="",
+            event_name="bench",
+            db_path=self.db_path,
+            max_cell_length=50,
+            skip_fields=set(),
+            dry_run=True,
+            stage_mode=True,
+            allowed_exts={"mp3", "jpg"},
+            filename_template="{n} {title} №{card} {value_title}",
+            max_title_length=80,
+        )
+
+    @property
+    def client(self) -> Cosplay2Client:
+        return cast("Cosplay2Client", SyntheticClient(self.event))
+
+    def make_db(self) -> None:
+        make_db(client=self.client, db_path=self.db_path)
+
+    def make_db_incremental(self) -> None:
+        make_db(client=self.client, db_path=self.db_path, incremental=True)
+
+    def make_data(self) -> None:
+        with get_session(db_path=self.db_path, read_only=True) as session:
+            make_data(self.workdir / "data.xlsx", session=session, config=self.config)
+
+    def make_plan(self) -> None:
+        with get_session(db_path=self.db_path, read_only=True) as session:
+            make_plan([self.workdir / "plan.xlsx"], session=session)
+
+    def prepare_files(self) -> None:
+        """Put an empty ``<value id>.<ext>`` file in place of every upload."""
+        self.input_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(exist_ok=True)
+        stmt = select(RequestFile.value_id, RequestFile.fileext).where(
+            RequestFile.filename.is_not(None)
+        )
+        with get_session(db_path=self.db_path, read_only=True) as session:
+            for value_id, ext in session.execute(stmt):
+                (self.input_dir / f"{value_id}.{ext or 'jpg'}").touch()
+
+    def move_files(self) -> None:
+        with get_session(db_path=self.db_path, read_only=True) as session:
+            move_files(
+                input_dir=self.input_dir,
+                output_dir=self.output_dir,
+                session=session,
+                config=self.config,
+            )
+
+
+# Stages in the order a festival runs them. move_files runs with dry_run, so
+# it resolves every destination but copies nothing.
+STAGES: dict[str, Callable[[PipelineRun], None]] = {
+    "make_db": PipelineRun.make_db,
+    "make_db -i": PipelineRun.make_db_incremental,
+    "make_data": PipelineRun.make_data,
+    "make_plan": PipelineRun.make_plan,
+    "move_files": PipelineRun.move_files,
+}
+
+
+def _run_stage(
+    stage: Callable[[PipelineRun], None], run: PipelineRun, *, trace: bool
+) -> tuple[float, int]:
+    """Wall time (or, with ``trace``, peak traced memory) of one cold stage."""
+    with Path(os.devnull).open("w") as devnull, contextlib.redirect_stdout(devnull):
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        stage(run)
+        elapsed = time.perf_counter() - started
+        peak = 0
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return elapsed, peak
+
+
+def run_suite(
+    sizes: list[int], *, memory: bool, seed: int
+) -> dict[int, dict[str, StageResult]]:
+    results: dict[int, dict[str, StageResult]] = {}
+    for size in sizes:
+        print(f"⏳ Заявок: {size}...")
+        event = generate_event(requests=size, seed=seed)
+        results[size] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            run = PipelineRun(event, Path(tmp))
+            for name, stage in STAGES.items():
+                if stage is PipelineRun.move_files:
+                    run.prepare_files()
+                elapsed, _ = _run_stage(stage, run, trace=False)
+                # tracemalloc slows everything down, so memory is measured on a
+                # second, untimed run of the same stage.
+                _, peak = _run_stage(stage, run, trace=True) if memory else (0, 0)
+                results[size][name] = StageResult(elapsed, peak)
+    return results
+
+
+def save_results(path: Path, results: dict[int, dict[str, StageResult]]) -> None:
+    data = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {
+            str(size): {name: asdict(result) for name, result in stages.items()}
+            for size, stages in results.items()
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_results(path: Path) -> dict[int, dict[str, StageResult]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != RESULTS_VERSION:
+        msg = f"Результаты в {path} получены другой версией бенчмарка"
+        raise typer.BadParameter(msg, param_hint="--baseline")
+    return {
+        int(size): {name: StageResult(**result) for name, result in stages.items()}
+        for size, stages in data["results"].items()
+    }
+
+
+def _ratio(current: float, previous: float) -> str:
+    # Zero means "not measured", e.g. memory with --no-memory.
+    return f"×{current / previous:.2f}" if current and previous else "-"
+
+
+def results_table(
+    results: dict[int, dict[str, StageResult]],
+    baseline: dict[int, dict[str, StageResult]] | None = None,
+) -> Table:
+    table = Table(title="🏁 Этапы на синтетическом событии")
+    table.add_column("Заявок", justify="right")
+    table.add_column("Этап")
+    table.add_column("Время, с", justify="right")
+    table.add_column("Пик памяти, МБ", justify="right")
+    if baseline is not None:
+        table.add_column("Время к базовому", justify="right")
+        table.add_column("Память к базовому", justify="right")
+    for size, stages in results.items():
+        for name, result in stages.items():
+            row = [
+                str(size),
+                name,
+                f"{result.time:.2f}",
+                f"{result.peak_memory / BYTES_PER_MB:.1f}",
+            ]
+            if baseline is not None:
+                previous = baseline.get(size, {}).get(name)
+                row += (
+                    [
+                        _ratio(result.time, previous.time),
+                        _ratio(result.peak_memory, previous.peak_memory),
+                    ]
+                    if previous
+                    else ["-", "-"]
+                )
+            table.add_row(*row)
+        table.add_section()
+    return table
+
+
+def find_regressions(
+    results: dict[int, dict[str, StageResult]],
+    baseline: dict[int, dict[str, StageResult]],
+    max_slowdown: float,
+) -> list[str]:
+    regressions = []
+    for size, stages in results.items():
+        for name, result in stages.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous and result.time > previous.time * max_slowdown:
+                regressions.append(
+                    f"{name} на {size} заявках: "
+                    f"{previous.time:.2f} с → {result.time:.2f} с"
+                )
+    return regressions
+
+
+def main(
+    *,
+    sizes: Annotated[
+        list[int] | None,
+        typer.Option("--size", help="Сколько заявок сгенерировать (можно повторять)"),
+    ] = None,
+    memory: Annotated[
+        bool, typer.Option(help="Замерять пиковую память (второй прогон этапа)")
+    ] = True,
+    seed: Annotated[int, typer.Option(help="Зерно генератора")] = 0,
+    save: Annotated[
+        Path | None,
+        typer.Option(dir_okay=False, help="Сохранить результаты в JSON-файл"),
+    ] = None,
+    baseline: Annotated[
+        Path | None,
+        typer.Option(
+            exists=True,
+            dir_okay=False,
+            help="Сравнить с ранее сохранёнными результатами",
+        ),
+    ] = None,
+    max_slowdown: Annotated[
+        float,
+        typer.Option(
+            help="Во сколько раз этап может замедлиться относительно --baseline"
+        ),
+    ] = 1.2,
+) -> None:
+    """Run every pipeline stage on synthetic events of the given sizes."""
+    previous = load_results(baseline) if baseline is not None else None
+    results = run_suite(sizes or DEFAULT_SIZES, memory=memory, seed=seed)
+    print(results_table(results, previous))
+    if save is not None:
+        save_results(save, results)
+        print(f"💾 Результаты сохранены в {save.absolute()}")
+    if previous is not None:
+        regressions = find_regressions(results, previous, max_slowdown)
+        for line in regressions:
+            print(f"🐢 {line}")
+        if regressions:
+            raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,138 @@
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated
+
+import typer
+from rich import print
+from rich.table import Table
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from fangen.bench.ingest import ingest_bulk
+from fangen.bench.synthetic import generate_event
+from fangen.cosplay2.models.vo import RequestStatus
+from fangen.db.dataset import load_dataset, stream_summary_data
+from fangen.db.factory import create_db, get_session, make_engine
+from fangen.db.models import Base, Request, RequestValue
+from fangen.db.models.node import PlanNode
+from fangen.db.repo import get_approved_files, get_files
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from sqlalchemy import Engine, Select
+
+
+def _rows(stmt: Select) -> Callable[[Session], Sequence[object]]:
+    return lambda session: session.execute(stmt).all()
+
+
+# The loaders as the commands call them: SQL plus building the rows or the
+# ORM objects.
+LOADERS: dict[str, Callable[[Session], object]] = {
+    "load_dataset": load_dataset,
+    "stream_summary_data": lambda session: list(stream_summary_data(session)),
+    "get_files": get_files,
+    "get_approved_files": get_approved_files,
+}
+
+# The bare SQL shapes those loaders rely on: filters, joins and sorts on the
+# indexed columns, without the overhead of building their results.
+SQL_QUERIES: dict[str, Callable[[Session], object]] = {
+    "SQL: значения одобренных заявок": _rows(
+        select(RequestValue.__table__)
+        .join(Request, Request.id == RequestValue.request_id)
+        .where(Request.status == RequestStatus.APPROVED)
+        .order_by(RequestValue.request_id, RequestValue.id)
+    ),
+    "SQL: заявки раздела": _rows(
+        select(Request.__table__).where(
+            Request.topic_id == 1, Request.status == RequestStatus.APPROVED
+        )
+    ),
+    "SQL: расписание по времени": _rows(
+        select(PlanNode.__table__).order_by(PlanNode.time_start)
+    ),
+    "SQL: дочерние узлы расписания": _rows(
+        select(PlanNode.__table__).where(PlanNode.parent_id == "t1")
+    ),
+    "SQL: значения одной заявки": _rows(
+        select(RequestValue.__table__).where(RequestValue.request_id == 1)
+    ),
+}
+
+
+def _time_queries(
+    engine: Engine,
+    queries: dict[str, Callable[[Session], object]],
+    repeat: int,
+) -> dict[str, float]:
+    """Best-of-``repeat`` wall time of every query, each on a fresh session."""
+    timings = {}
+    for name, query in queries.items():
+        best = float("inf")
+        for _ in range(repeat):
+            with Session(engine) as session:
+                started = time.perf_counter()
+                query(session)
+                best = min(best, time.perf_counter() - started)
+        timings[name] = best
+    return timings
+
+
+def main(
+    requests: Annotated[
+        int, typer.Option(help="Сколько заявок сгенерировать")
+    ] = 20_000,
+    repeat: Annotated[int, typer.Option(help="Повторов каждого запроса")] = 3,
+    *,
+    loaders: Annotated[
+        bool,
+        typer.Option(help="Замерять и загрузку данных командами, а не только SQL"),
+    ] = True,
+) -> None:
+    """Time the repo queries without and with the indexes and tuned pragmas."""
+    queries = {**LOADERS, **SQL_QUERIES} if loaders else SQL_QUERIES
+    event = generate_event(requests=requests)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        create_db(db_path=db_path)
+        with get_session(db_path=db_path) as session:
+            ingest_bulk(session, event)
+            session.commit()
+
+        # Baseline: the schema without secondary indexes on an engine with
+        # SQLite's default settings.
+        plain = create_engine(url=f"sqlite:///{db_path}")
+        indexes = [
+            index for table in Base.metadata.sorted_tables for index in table.indexes
+        ]
+        for index in indexes:
+            index.drop(plain)
+        baseline = _time_queries(plain, queries, repeat)
+        plain.dispose()
+
+        tuned_engine = make_engine(db_path)
+        for index in indexes:
+            index.create(tuned_engine)
+        tuned = _time_queries(tuned_engine, queries, repeat)
+        tuned_engine.dispose()
+
+    table = Table(title=f"Заявок: {len(event.requests)}, значений: {len(event.values)}")
+    table.add_column("Запрос")
+    table.add_column("Без индексов, с", justify="right")
+    table.add_column("С индексами и PRAGMA, с", justify="right")
+    table.add_column("Ускорение", justify="right")
+    for name in queries:
+        table.add_row(
+            name,
+            f"{baseline[name]:.3f}",
+            f"{tuned[name]:.3f}",
+            f"×{baseline[name] / tuned[name]:.1f}",
+        )
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
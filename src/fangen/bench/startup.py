@@ -0,0 +1,78 @@
+import subprocess
+import sys
+from typing import Annotated
+
+import typer
+from rich import print
+from rich.table import Table
+
+# Heavy dependencies each module must not import, directly or through others.
+# The CLI itself imports none of them: every command imports its own.
+FORBIDDEN_IMPORTS = {
+    "fangen.__main__": ("adaptix", "sqlalchemy", "openpyxl", "requests", "yt_dlp"),
+    "fangen.db.stats": ("openpyxl", "requests", "yt_dlp"),
+    "fangen.db.update_db": ("openpyxl", "yt_dlp"),
+    "fangen.excel.flat": ("openpyxl", "requests", "yt_dlp"),
+    "fangen.excel.update_data": ("requests", "yt_dlp"),
+    "fangen.excel.update_plan": ("requests", "yt_dlp"),
+    "fangen.files.move_files": ("openpyxl", "requests", "yt_dlp"),
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time of every module ``module`` pulls in, in µs.
+
+    Runs a fresh interpreter with ``-X importtime``, so nothing is cached.
+    """
+    result = subprocess.run(  # noqa: S603 - our own interpreter and module name
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        # import time: <self> | <cumulative> | <indented module name>
+        _, sep, rest = line.partition("import time:")
+        parts = rest.split("|")
+        if not sep or len(parts) != 3 or not parts[1].strip().isdigit():  # noqa: PLR2004
+            continue
+        times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+def main(
+    budget: Annotated[
+        float | None,
+        typer.Option(help="Допустимое время импорта CLI, мс; без него не проверяется"),
+    ] = None,
+    repeat: Annotated[int, typer.Option(help="Запусков на модуль, берётся лучший")] = 3,
+) -> None:
+    """Check what the CLI and each command's module import, and how long it takes.
+
+    Only the imports fail the check by default: the time depends on the
+    machine and its load, so the CLI is held to ``budget`` only when given.
+    """
+    table = Table(title="🚀 Время импорта")
+    table.add_column("Модуль")
+    table.add_column("Время, мс", justify="right")
+    table.add_column("Лишние зависимости")
+    failures = []
+    for module, forbidden in FORBIDDEN_IMPORTS.items():
+        runs = [import_times(module) for _ in range(repeat)]
+        elapsed = min(times[module] for times in runs) / 1000
+        extra = [name for name in forbidden if name in runs[0]]
+        table.add_row(module, f"{elapsed:.0f}", ", ".join(extra) or "—")
+        if extra:
+            failures.append(f"{module} импортирует {', '.join(extra)}")
+        if module == "fangen.__main__" and budget is not None and elapsed > budget:
+            failures.append(f"{module}: {elapsed:.0f} мс, бюджет {budget:.0f} мс")
+    print(table)
+    for failure in failures:
+        print(f"🐢 {failure}")
+    if failures:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
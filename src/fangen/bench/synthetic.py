@@ -0,0 +1,251 @@
+import json
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from fangen.cosplay2.models.plan import PlanNodeDTO
+from fangen.cosplay2.models.request import RequestDTO
+from fangen.cosplay2.models.topic import (
+    TopicDTO,
+    TopicFieldDTO,
+    TopicSectionDTO,
+    TopicWithFieldsDTO,
+)
+from fangen.cosplay2.models.value import RequestValueDTO
+from fangen.cosplay2.models.vo import PlanNodeType, RequestStatus, ValueType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+EVENT_ID = 1000
+
+# Share of approved requests, and of FILE values that are external links
+# instead of Cosplay2 uploads.
+APPROVED_SHARE = 0.75
+LINK_FILE_SHARE = 0.2
+
+# Length of the opening ceremony and of the break after every topic, in ms.
+OPENING_LENGTH = 15 * 60 * 1000
+BREAK_LENGTH = 10 * 60 * 1000
+
+# Field layout shared by every synthetic topic: (title, type). Repeated titles
+# model multi-value fields such as several characters in one cosplay.
+FIELDS = [
+    ("ФИО", ValueType.TEXT),
+    ("Город", ValueType.TEXT),
+    ("Телефон", ValueType.PHONE),
+    ("Описание", ValueType.TEXTAREA),
+    ("Ссылка на соцсети", ValueType.LINK),
+    ("Согласие", ValueType.CHECKBOX),
+    ("Участник", ValueType.USER),
+    ("Длительность", ValueType.DURATION),
+    ("Фото", ValueType.IMAGE),
+    ("Категория", ValueType.SELECT),
+    ("Количество участников", ValueType.NUM),
+    ("Фонограмма", ValueType.FILE),
+    ("Персонаж", ValueType.TEXT),
+]
+
+
+@dataclass(slots=True, frozen=True)
+class SyntheticEvent:
+    topics: list[TopicDTO]
+    topics_with_fields: list[TopicWithFieldsDTO]
+    requests: list[RequestDTO]
+    values: list[RequestValueDTO]
+    plan: list[PlanNodeDTO]
+
+
+def _value(rng: random.Random, request_id: int, kind: ValueType) -> str:
+    match kind:
+        case ValueType.CHECKBOX:
+            return rng.choice(["YES", "NO"])
+        case ValueType.DURATION:
+            return f"{rng.uniform(1, 6):.2f}"
+        case ValueType.NUM:
+            return str(rng.randint(1, 12))
+        case ValueType.IMAGE:
+            return json.dumps({"filename": f"img_{request_id}_{rng.randrange(10**6)}"})
+        case ValueType.FILE:
+            if rng.random() < LINK_FILE_SHARE:
+                return json.dumps({"link": f"https://example.com/{request_id}.mp4"})
+            return json.dumps(
+                {
+                    "filename": f"track_{request_id}.mp3",
+                    "filesize": rng.randint(10**5, 10**7),
+                    "fileext": "mp3",
+                }
+            )
+        case ValueType.LINK:
+            return f"https://vk.com/id{request_id}"
+        case ValueType.PHONE:
+            return f"+7900{request_id:07d}"
+        case _:
+            return " ".join(
+                f"слово{rng.randrange(1000)}" for _ in range(rng.randint(1, 8))
+            )
+
+
+def generate_event(
+    requests: int = 1000,
+    values_per_request: int = len(FIELDS),
+    topics: int = 10,
+    seed: int = 0,
+) -> SyntheticEvent:
+    """Build a Cosplay2-shaped event with ``requests`` requests.
+
+    Each request gets ``values_per_request`` values cycling through
+    ``FIELDS``, which cover every ``ValueType``; roughly three quarters of the
+    requests are approved and placed into a day -> topic -> request plan with
+    consecutive start times, opened by an event and with a break after every
+    topic.
+    """
+    # Reproducible test data, not security-sensitive.
+    rng = random.Random(seed)  # noqa: S311
+
+    topic_dtos = [
+        TopicDTO(
+            id=topic_id,
+            event_id=EVENT_ID,
+            url_code=f"topic{topic_id}",
+            card_code=f"T{topic_id}",
+            title=f"Раздел {topic_id}",
+            order=topic_id,
+        )
+        for topic_id in range(1, topics + 1)
+    ]
+    with_fields = [
+        TopicWithFieldsDTO(
+            topic=topic,
+            topic_sections=[TopicSectionDTO(topic.id, topic.id, "Анкета", 1)],
+            topic_fields=[
+                TopicFieldDTO(topic.id * 100 + order, topic.id, title, order, kind)
+                for order, (title, kind) in enumerate(FIELDS)
+            ],
+        )
+        for topic in topic_dtos
+    ]
+
+    request_dtos: list[RequestDTO] = []
+    value_dtos: list[RequestValueDTO] = []
+    for request_id in range(1, requests + 1):
+        update_time = f"{rng.randint(1, 28):02d}.06.25 {rng.randint(10, 23)}:00"
+        request_dtos.append(
+            RequestDTO(
+                id=request_id,
+                topic_id=rng.randint(1, topics),
+                number=request_id,
+                status=(
+                    RequestStatus.APPROVED
+                    if rng.random() < APPROVED_SHARE
+                    else rng.choice(list(RequestStatus))
+                ),
+                update_time=update_time,
+                user_id=request_id,
+                user_title=f"Участник {request_id}",
+                voting_number=request_id,
+                voting_title=f"Заявка {request_id}",
+            )
+        )
+        for index in range(values_per_request):
+            title, kind = FIELDS[index % len(FIELDS)]
+            value_dtos.append(
+                RequestValueDTO(
+                    request_id=request_id,
+                    title=title,
+                    type=kind,
+                    value=_value(rng, request_id, kind),
+                )
+            )
+
+    time = 10 * 3600 * 1000
+    day_nodes = [
+        PlanNodeDTO(
+            uid="e1",
+            type=PlanNodeType.EVENT,
+            title="Открытие",
+            time_start=time,
+            time_end=time + OPENING_LENGTH,
+        )
+    ]
+    time += OPENING_LENGTH
+    for topic in topic_dtos:
+        request_nodes: list[PlanNodeDTO] = []
+        for request in request_dtos:
+            if request.topic_id != topic.id or request.status != RequestStatus.APPROVED:
+                continue
+            length = rng.randint(60, 300) * 1000
+            request_nodes.append(
+                PlanNodeDTO(
+                    uid=f"r{request.id}",
+                    type=PlanNodeType.REQUEST,
+                    title=request.voting_title or "",
+                    request_length=length,
+                    time_start=time,
+                    time_end=time + length,
+                    request_id=request.id,
+                    topic_id=topic.id,
+                )
+            )
+            time += length
+        day_nodes.append(
+            PlanNodeDTO(
+                uid=f"t{topic.id}",
+                type=PlanNodeType.TOPIC,
+                title=topic.title,
+                time_start=request_nodes[0].time_start if request_nodes else time,
+                time_end=time,
+                topic_id=topic.id,
+                nodes=request_nodes,
+            )
+        )
+        day_nodes.append(
+            PlanNodeDTO(
+                uid=f"b{topic.id}",
+                type=PlanNodeType.BREAK,
+                title="Перерыв",
+                time_start=time,
+                time_end=time + BREAK_LENGTH,
+            )
+        )
+        time += BREAK_LENGTH
+    plan = [
+        PlanNodeDTO(uid="d1", type=PlanNodeType.DAY, title="День 1", nodes=day_nodes)
+    ]
+
+    return SyntheticEvent(
+        topics=topic_dtos,
+        topics_with_fields=with_fields,
+        requests=request_dtos,
+        values=value_dtos,
+        plan=plan,
+    )
+
+
+class SyntheticClient:
+    """Serves a ``SyntheticEvent`` through the ``Cosplay2Client`` interface."""
+
+    def __init__(self, event: SyntheticEvent) -> None:
+        self.event = event
+        self._with_fields = {
+            with_fields.topic.url_code: with_fields
+            for with_fields in event.topics_with_fields
+        }
+
+    def get_list(self) -> list[TopicDTO]:
+        return self.event.topics
+
+    def get_plan(self) -> list[PlanNodeDTO]:
+        return self.event.plan
+
+    def get_all_requests(self) -> list[RequestDTO]:
+        return self.event.requests
+
+    def get_all_values(self) -> list[RequestValueDTO]:
+        return self.event.values
+
+    def iter_all_values(self) -> Iterator[RequestValueDTO]:
+        return iter(self.event.values)
+
+    def get_with_fields(self, topic_url_code: str) -> TopicWithFieldsDTO:
+        return self._with_fields[topic_url_code]
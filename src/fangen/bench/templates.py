@@ -0,0 +1,150 @@
+import re
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Annotated
+
+import typer
+from rich import print
+from rich.table import Table
+
+from fangen.bench.synthetic import generate_event
+from fangen.common.utils import (
+    MULTI_VALUE_SEPARATOR,
+    TRANSFORM_MARKER,
+    _compile_transform,
+    _warn_bad_transform,
+    compile_template,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fangen.bench.synthetic import SyntheticEvent
+
+# Headers as found in real plan files, plus the default filename template.
+TEMPLATES = [
+    "{n}",
+    "{info}",
+    "{code} {card}. {title}",
+    "{Персонаж:s/,.*//}",
+    "{title|ФИО}",
+    "{Город} / {Категория:s/^(.)/[\\1]/}",
+    "Длительность: {Длительность}, участников: {Количество участников}",
+    "{code}/{n}. {title|info} ({Персонаж|ФИО})",
+]
+
+
+def legacy_format_template(template: str, data: dict) -> str:
+    """``format_template`` as it was before templates were compiled."""
+    variable_pattern = r"\{(.*?)\}"
+
+    def replace_match(match: re.Match[str]) -> str:
+        content = match.group(1)
+        marker = content.find(TRANSFORM_MARKER)
+        if marker != -1:
+            keys_part = content[:marker]
+            transform = content[marker + 1 :]
+        else:
+            keys_part = content
+            transform = None
+
+        keys = keys_part.split("|")
+        value = None
+        for key in keys:
+            value = data.get(key)
+            if value:
+                break
+
+        if isinstance(value, list):
+            parts = [
+                str(item) for item in value if item is not None and str(item) != ""
+            ]
+            rendered = MULTI_VALUE_SEPARATOR.join(parts)
+        else:
+            rendered = str(value) if value else ""
+
+        if transform:
+            compiled = _compile_transform(transform)
+            if compiled is not None:
+                pattern, replacement, count = compiled
+                try:
+                    rendered = pattern.sub(replacement, rendered, count=count)
+                except re.error:
+                    _warn_bad_transform(transform)
+
+        return rendered
+
+    return re.sub(variable_pattern, replace_match, template)
+
+
+def build_rows(event: SyntheticEvent) -> list[dict]:
+    """Template data shaped like ``Dataset.request_data``, one dict per request."""
+    values = defaultdict(list)
+    for value in event.values:
+        values[value.request_id].append(value)
+    codes = {topic.id: topic.card_code for topic in event.topics}
+
+    rows = []
+    for n, request in enumerate(event.requests, 1):
+        data: dict = {
+            "n": f"{n:03}",
+            "info": request.voting_title,
+            "title": request.voting_title,
+            "code": codes[request.topic_id],
+            "card": request.voting_number,
+        }
+        for value in values[request.id]:
+            existing = data.get(value.title)
+            if isinstance(existing, list):
+                existing.append(value.value)
+            elif existing:
+                data[value.title] = [existing, value.value]
+            else:
+                data[value.title] = value.value
+        rows.append(data)
+    return rows
+
+
+def _best_of(repeat: int, run: Callable[[], list[str]]) -> tuple[float, list[str]]:
+    best = float("inf")
+    result: list[str] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(
+    requests: Annotated[int, typer.Option(help="Сколько заявок сгенерировать")] = 5000,
+    repeat: Annotated[int, typer.Option(help="Повторов каждого замера")] = 5,
+) -> None:
+    """Compare the regex-per-call and compiled template renderers."""
+    rows = build_rows(generate_event(requests=requests))
+
+    table = Table(title=f"Строк: {len(rows)}")
+    table.add_column("Шаблон")
+    for column in ("format_template, с", "Скомпилированный, с", "Ускорение"):
+        table.add_column(column, justify="right")
+    for template in TEMPLATES:
+        legacy, expected = _best_of(
+            repeat,
+            lambda template=template: [
+                legacy_format_template(template, data) for data in rows
+            ],
+        )
+        compiled, rendered = _best_of(
+            repeat,
+            lambda template=template: compile_template(template).render_many(rows),
+        )
+        if rendered != expected:
+            msg = f"Результаты для шаблона {template!r} не совпадают"
+            raise AssertionError(msg)
+        table.add_row(
+            template, f"{legacy:.4f}", f"{compiled:.4f}", f"×{legacy / compiled:.1f}"
+        )
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
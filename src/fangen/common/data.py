@@ -1,20 +1,19 @@
 import datetime
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
-from fangen.common.utils import build_cosplay2_file_link, build_cosplay2_image_link
-from fangen.common.values import (
-    parse_checkbox_value,
-    parse_duration_value,
-    parse_file_value,
-    parse_image_value,
-)
+from fangen.common.utils import MULTI_VALUE_SEPARATOR
+from fangen.common.values import FILE_VALUE_TYPES
 from fangen.cosplay2.models.vo import PlanNodeType, ValueType
 
 if TYPE_CHECKING:
-    from fangen.db.models import Request, RequestValue, Topic
-    from fangen.db.models.node import PlanNode
+    from collections.abc import Callable
 
-NodeData = dict[str, str | int | list | None]
+    from fangen.db.dataset import PlanRow, TopicRow
+
+# A template value: several values of one field title are collected in a list.
+NodeValue = str | int | list | None
+NodeData = dict[str, NodeValue]
 
 
 def format_timestamp(time: int) -> str:
@@ -23,69 +22,96 @@ def format_timestamp(time: int) -> str:
     )
 
 
-def parse_value(value: RequestValue) -> str | None:
-    if value.value is None:
+def format_value(
+    value_type: ValueType,
+    value: str | None,
+    *,
+    checkbox: bool | None,
+    duration_seconds: int | None,
+    url: str | None,
+) -> str | None:
+    """Render a stored value from its raw string and typed columns."""
+    if value is None:
         return None
-    if value.type is ValueType.CHECKBOX:
-        return "Да" if parse_checkbox_value(value) else "Нет"
-    if value.type is ValueType.IMAGE:
-        image_value = parse_image_value(value)
-        return build_cosplay2_image_link(
-            event_id=value.request.topic.event_id,
-            request_id=value.request_id,
-            filename=image_value.filename,
-        )
-    if value.type is ValueType.FILE:
-        file_value = parse_file_value(value)
-        if file_value.filename:
-            return build_cosplay2_file_link(
-                event_id=value.request.topic.event_id,
-                request_id=value.request_id,
-                filename=file_value.filename,
-            )
-        return file_value.link
-    if value.type is ValueType.DURATION:
-        td = parse_duration_value(value)
-        total_seconds = int(td.total_seconds())
-        minutes = total_seconds // 60
-        seconds = total_seconds % 60
+    if value_type is ValueType.CHECKBOX:
+        return "Да" if checkbox else "Нет"
+    if value_type in FILE_VALUE_TYPES:
+        # Unpacked and resolved once at ingest time (see RequestFile).
+        return url
+    if value_type is ValueType.DURATION and duration_seconds is not None:
+        minutes, seconds = divmod(duration_seconds, 60)
         return f"{minutes:02d}:{seconds:02d}"
-    return str(value.value)
+    return str(value)
+
+
+def merge_value(existing: NodeValue, new: str | int | None) -> NodeValue:
+    """Combine another value of a field with the ones already collected.
+
+    If there are multiple values with same key, they are put in a list.
+    """
+    if existing and isinstance(existing, list):
+        existing.append(new)
+        return existing
+    if existing:
+        return [existing, new]
+    return new
 
 
-def parse_event_node(event: PlanNode) -> dict:
+def render_value(value: object, empty: str = "") -> str:
+    """Render a parsed request value as a single cell string.
+
+    Multiple values are joined with MULTI_VALUE_SEPARATOR; missing or empty
+    values become ``empty`` (a visible dash in Excel, nothing in flat files).
+    """
+    if isinstance(value, list):
+        parts = [str(item) for item in value if item is not None and str(item) != ""]
+        return MULTI_VALUE_SEPARATOR.join(parts) if parts else empty
+    if value is None or value == "":
+        return empty
+    return str(value)
+
+
+def parse_event_node(event: PlanRow) -> dict:
     return {"info": event.title}
 
 
-def parse_topic(topic: Topic) -> dict:
+def parse_topic(topic: TopicRow) -> dict:
     return {"info": topic.title, "code": topic.card_code}
 
 
-def parse_request(request: Request) -> dict:
-    data: NodeData = {
-        "info": request.voting_title,
-        "title": request.voting_title,
-        "code": request.topic.card_code if request.topic else None,
-        "topic_title": request.topic.title if request.topic else None,
-        "card": request.voting_number,
-    }
-    for value in request.values:
-        value: RequestValue
-        processed_value = parse_value(value)
-        # If there are multiple values with same
-        # key put them in a list
-        existing_value = data.get(value.title)
-        if existing_value and isinstance(existing_value, list):
-            existing_value.append(processed_value)
-            data[value.title] = existing_value
-        elif existing_value:
-            data[value.title] = [existing_value, processed_value]
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class RequestDataCache:
+    """Parsed request data of one dataset, built once per request row.
+
+    It lives and dies with its dataset, so it never outlasts the data it
+    was built from. ``stats`` counts lookups for profiling.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[int, NodeData] = {}
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: int, build: Callable[[], NodeData]) -> NodeData:
+        """Return the data cached under ``key``, calling ``build`` on a miss."""
+        data = self._data.get(key)
+        if data is None:
+            self.stats.misses += 1
+            data = self._data[key] = build()
         else:
-            data[value.title] = processed_value
-    return data
+            self.stats.hits += 1
+        return data
 
 
-def get_node_data(node: PlanNode) -> NodeData:
+def get_node_base_data(node: PlanRow) -> NodeData:
+    """Node data without the request part."""
     # Basic node data
     data: NodeData = {
         "uid": node.uid,
@@ -100,6 +126,4 @@ def get_node_data(node: PlanNode) -> NodeData:
         data.update(parse_event_node(node))
     if node.type is PlanNodeType.TOPIC and node.topic is not None:
         data.update(parse_topic(node.topic))
-    if node.type is PlanNodeType.REQUEST and node.request is not None:
-        data.update(parse_request(node.request))
     return data
@@ -0,0 +1,169 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+from rich.table import Table
+
+from fangen.common.data import CacheStats
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from sqlalchemy.engine import ExceptionContext, ExecutionContext
+
+    from fangen.common.data import RequestDataCache
+
+BYTES_PER_MB = 1024 * 1024
+
+
+@dataclass(slots=True)
+class StageStats:
+    calls: int = 0
+    wall_time: float = 0.0
+    peak_memory: int = 0
+
+
+@dataclass(slots=True)
+class Profile:
+    """Counters of one ``--profile`` run.
+
+    Stages are timed with ``perf_counter`` and their peak memory traced with
+    ``tracemalloc`` (which slows the run down noticeably, so it is only on
+    while profiling). SQL statements are counted through SQLAlchemy cursor
+    events, HTTP calls and bytes by the Cosplay2 client.
+    """
+
+    enabled: bool = False
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    sql_statements: int = 0
+    sql_time: float = 0.0
+    http_calls: int = 0
+    http_bytes: int = 0
+    # Counters of the request data caches of the datasets loaded so far.
+    caches: list[CacheStats] = field(default_factory=list)
+    # Peak memory seen so far by each running stage, innermost last.
+    _peaks: list[int] = field(default_factory=list)
+
+    def start(self) -> None:
+        # Imported here, as the HTTP client imports this module as well and
+        # should not pull SQLAlchemy in with it.
+        from sqlalchemy import Engine, event  # noqa: PLC0415
+
+        self.enabled = True
+        tracemalloc.start()
+        event.listen(
+            Engine, "before_cursor_execute", _before_cursor_execute, named=True
+        )
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute, named=True)
+        event.listen(Engine, "handle_error", _handle_error)
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None]:
+        """Time the enclosed block as stage ``name``; a no-op when disabled."""
+        if not self.enabled:
+            yield
+            return
+        if self._peaks:
+            # reset_peak() below would lose the peak of the enclosing stage.
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.wall_time += elapsed
+            stats.peak_memory = max(stats.peak_memory, peak)
+
+    def track_cache(self, cache: RequestDataCache) -> None:
+        """Report the hits and misses of ``cache``; a no-op when disabled."""
+        if self.enabled:
+            self.caches.append(cache.stats)
+
+    def cache_stats(self) -> tuple[int, int]:
+        """Hits and misses of every tracked cache together."""
+        return (
+            sum(cache.hits for cache in self.caches),
+            sum(cache.misses for cache in self.caches),
+        )
+
+    def record_http(self, size: int = 0, *, call: bool = False) -> None:
+        if self.enabled:
+            self.http_calls += call
+            self.http_bytes += size
+
+    def table(self) -> Table:
+        table = Table(title="⏱️ Профиль выполнения")
+        table.add_column("Этап")
+        for column in ("Вызовов", "Время, с", "Пик памяти, МБ"):
+            table.add_column(column, justify="right")
+        for name, stats in self.stages.items():
+            table.add_row(
+                name,
+                str(stats.calls),
+                f"{stats.wall_time:.2f}",
+                f"{stats.peak_memory / BYTES_PER_MB:.1f}",
+            )
+        table.add_section()
+        table.add_row(
+            "SQL-запросы", str(self.sql_statements), f"{self.sql_time:.2f}", ""
+        )
+        table.add_row(
+            "HTTP-запросы",
+            str(self.http_calls),
+            "",
+            f"{self.http_bytes / BYTES_PER_MB:.1f} получено",
+        )
+        hits, misses = self.cache_stats()
+        table.add_row(
+            "Кэш данных заявок", f"{hits} попаданий", f"{misses} промахов", ""
+        )
+        return table
+
+    def to_dict(self) -> dict:
+        hits, misses = self.cache_stats()
+        return {
+            "stages": {name: asdict(stats) for name, stats in self.stages.items()},
+            "sql": {"statements": self.sql_statements, "time": self.sql_time},
+            "http": {"calls": self.http_calls, "bytes": self.http_bytes},
+            "request_data_cache": {"hits": hits, "misses": misses},
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(
+            json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+
+# The profile of this process; stays disabled unless --profile is given.
+profile = Profile()
+
+
+# Start times of the statements being executed. A statement that raises never
+# gets to after_cursor_execute, so handle_error drops its start time instead.
+_query_started: dict[ExecutionContext, float] = {}
+
+
+def _before_cursor_execute(context: ExecutionContext, **_: object) -> None:
+    _query_started[context] = time.perf_counter()
+
+
+def _after_cursor_execute(context: ExecutionContext, **_: object) -> None:
+    started = _query_started.pop(context)
+    profile.sql_statements += 1
+    profile.sql_time += time.perf_counter() - started
+
+
+def _handle_error(exception_context: ExceptionContext) -> None:
+    if exception_context.execution_context is not None:
+        _query_started.pop(exception_context.execution_context, None)
@@ -1,8 +1,12 @@
 import re
 from functools import cache
+from typing import TYPE_CHECKING
 
 from rich import print
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
 # Separator used when a single field holds several values. Rendering them as a
 # joined string keeps cells readable instead of leaking Python's list repr
 # (e.g. "['a', 'b']") into Excel output and filled templates.
@@ -18,6 +22,9 @@ TRANSFORM_MARKER = ":s/"
 # these four parts once the leading "s" is dropped: ["", pattern, repl, flags].
 _TRANSFORM_PARTS = 4
 
+# A "{...}" placeholder; the group is its content (keys plus optional transform).
+_PLACEHOLDER_PATTERN = re.compile(r"\{(.*?)\}")
+
 # Transforms that fail to compile / apply are reported once each; templates are
 # reused for every request, so without this guard a bad pattern would spam the
 # console with one warning per row.
@@ -72,51 +79,110 @@ def _compile_transform(transform: str) -> tuple[re.Pattern[str], str, int] | Non
     return compiled, replacement, count
 
 
-def format_template(template: str, data: dict) -> str:
-    variable_pattern = r"\{(.*?)\}"
-
-    def replace_match(match: re.Match[str]) -> str:
-        content = match.group(1)
-
-        # Split off an optional "s/.../.../" transform. The key part keeps any
-        # other colons, so field titles like "Ссылка: VK" are unaffected.
-        marker = content.find(TRANSFORM_MARKER)
-        if marker != -1:
-            keys_part = content[:marker]
-            transform = content[marker + 1 :]  # keep the leading "s"
-        else:
-            keys_part = content
-            transform = None
-
-        keys = keys_part.split("|")
-        value = None
-        for key in keys:
-            value = data.get(key)
-            if value:
-                # Use the first key that resolves to a non-empty value
-                break
-
-        if isinstance(value, list):
-            # Several values under one field title: join them into a flat
-            # string rather than emitting Python's list repr.
-            parts = [
-                str(item) for item in value if item is not None and str(item) != ""
-            ]
-            rendered = MULTI_VALUE_SEPARATOR.join(parts)
-        else:
-            rendered = str(value) if value else ""
-
-        if transform:
-            compiled = _compile_transform(transform)
-            if compiled is not None:
-                pattern, replacement, count = compiled
-                try:
-                    rendered = pattern.sub(replacement, rendered, count=count)
-                except re.error:
-                    # e.g. an invalid backreference in the replacement string.
-                    # Fall back to the untransformed value instead of raising.
-                    _warn_bad_transform(transform)
-
-        return rendered
-
-    return re.sub(variable_pattern, replace_match, template)
+def _stringify(value: object) -> str:
+    if isinstance(value, list):
+        # Several values under one field title: join them into a flat
+        # string rather than emitting Python's list repr.
+        parts = [str(item) for item in value if item is not None and str(item) != ""]
+        return MULTI_VALUE_SEPARATOR.join(parts)
+    return str(value) if value else ""
+
+
+def _bind_transform(
+    lookup: Callable[[Mapping], str], transform: str
+) -> Callable[[Mapping], str]:
+    compiled = _compile_transform(transform)
+    if compiled is None:
+        return lookup
+    pattern, replacement, count = compiled
+
+    def render(data: Mapping) -> str:
+        rendered = lookup(data)
+        try:
+            return pattern.sub(replacement, rendered, count=count)
+        except re.error:
+            # e.g. an invalid backreference in the replacement string.
+            # Fall back to the untransformed value instead of raising.
+            _warn_bad_transform(transform)
+            return rendered
+
+    return render
+
+
+def _compile_placeholder(content: str) -> Callable[[Mapping], str]:
+    """Turn the content of one "{...}" into a function of the row data."""
+    # Split off an optional "s/.../.../" transform. The key part keeps any
+    # other colons, so field titles like "Ссылка: VK" are unaffected.
+    marker = content.find(TRANSFORM_MARKER)
+    keys_part = content if marker == -1 else content[:marker]
+    keys = keys_part.split("|")
+
+    if len(keys) == 1:
+        (key,) = keys
+
+        def lookup(data: Mapping) -> str:
+            return _stringify(data.get(key))
+
+    else:
+
+        def lookup(data: Mapping) -> str:
+            value = None
+            for key in keys:
+                value = data.get(key)
+                if value:
+                    # Use the first key that resolves to a non-empty value
+                    break
+            return _stringify(value)
+
+    if marker == -1:
+        return lookup
+    return _bind_transform(lookup, content[marker + 1 :])  # keep the leading "s"
+
+
+class CompiledTemplate:
+    """A template parsed once into literal segments and placeholders.
+
+    Each placeholder becomes a function with its fallback keys and transform
+    already bound, so rendering is a walk over precomputed parts with no
+    regex scanning or string splitting per call.
+    """
+
+    __slots__ = ("_literals", "_placeholders", "_segments", "source")
+
+    def __init__(self, template: str) -> None:
+        self.source = template
+        # With one capturing group, re.split alternates literal text and
+        # placeholder contents, starting and ending with a (maybe empty)
+        # literal: the same matches format_template used to substitute.
+        parts = _PLACEHOLDER_PATTERN.split(template)
+        self._literals = parts[::2]
+        self._placeholders = [_compile_placeholder(content) for content in parts[1::2]]
+        # Each placeholder paired with the literal text that follows it.
+        self._segments = list(zip(self._placeholders, self._literals[1:], strict=True))
+
+    def render(self, data: Mapping) -> str:
+        return self._literals[0] + "".join(
+            [placeholder(data) + literal for placeholder, literal in self._segments]
+        )
+
+    def render_many(self, rows: Iterable[Mapping]) -> list[str]:
+        """Render the template once per row of data."""
+        if not self._placeholders:
+            return [self.source for _ in rows]
+        if len(self._placeholders) == 1:
+            # The most common header shape, "prefix{key}suffix".
+            prefix, suffix = self._literals
+            (placeholder,) = self._placeholders
+            return [prefix + placeholder(data) + suffix for data in rows]
+        render = self.render
+        return [render(data) for data in rows]
+
+
+@cache
+def compile_template(template: str) -> CompiledTemplate:
+    """Compile ``template``, reusing the result for repeated templates."""
+    return CompiledTemplate(template)
+
+
+def format_template(template: str, data: Mapping) -> str:
+    return compile_template(template).render(data)
@@ -3,9 +3,15 @@ import json
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
+from fangen.cosplay2.models.vo import ValueType
+
 if TYPE_CHECKING:
+    from fangen.cosplay2.models.value import RequestValueDTO
     from fangen.db.models import RequestValue
 
+# Values holding an uploaded file or a link to one, kept in the files table.
+FILE_VALUE_TYPES = {ValueType.FILE, ValueType.IMAGE}
+
 
 @dataclass(frozen=True, slots=True)
 class ImageValue:
@@ -23,11 +29,11 @@ class FileValue:
     link: str | None = None
 
 
-def parse_checkbox_value(value: RequestValue) -> bool:
+def parse_checkbox_value(value: RequestValue | RequestValueDTO) -> bool:
     return value.value == "YES"
 
 
-def parse_image_value(value: RequestValue) -> ImageValue:
+def parse_image_value(value: RequestValue | RequestValueDTO) -> ImageValue:
     if value.value is None:
         raise ValueError(value.title)
     image_info = json.loads(value.value)
@@ -35,7 +41,7 @@ def parse_image_value(value: RequestValue) -> ImageValue:
     return ImageValue(filename)
 
 
-def parse_file_value(value: RequestValue) -> FileValue:
+def parse_file_value(value: RequestValue | RequestValueDTO) -> FileValue:
     if value.value is None:
         raise ValueError(value.title)
     file_info = json.loads(value.value)
@@ -50,7 +56,14 @@ def parse_file_value(value: RequestValue) -> FileValue:
     )
 
 
-def parse_duration_value(value: RequestValue) -> datetime.timedelta:
+def parse_duration_value(value: RequestValue | RequestValueDTO) -> datetime.timedelta:
     if value.value is None:
         raise ValueError(value.title)
     return datetime.timedelta(minutes=float(value.value))
+
+
+def parse_number_value(value: RequestValue | RequestValueDTO) -> float:
+    if value.value is None:
+        raise ValueError(value.title)
+    # Accept the decimal comma people type into Cosplay2 forms.
+    return float(value.value.strip().replace(",", "."))
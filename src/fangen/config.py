@@ -4,6 +4,12 @@ from pathlib import Path
 
 from adaptix import Retort
 
+from fangen.cosplay2.defaults import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RATE_LIMIT,
+)
+
 # NOTE: `Path` must be imported at runtime, not under `TYPE_CHECKING`. adaptix
 # resolves the `Config` annotations at runtime via `get_type_hints` when
 # building the loader, so every annotated type has to be a real name in this
@@ -31,9 +37,36 @@ class Config:
     filename_template: str
     max_title_length: int
 
+    # Cosplay2 API tuning, optional
+    api_concurrency: int = DEFAULT_CONCURRENCY
+    api_rate_limit: float = DEFAULT_RATE_LIMIT
+    api_max_retries: int = DEFAULT_MAX_RETRIES
+    api_base_url: str | None = None
+    cache_dir: Path | None = None
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def check_config(config: Config) -> None:
+    """Reject values the API client can't work with, before any command runs.
+
+    Otherwise they would only fail deep inside make_db: its thread pool needs
+    a worker, and the rate limiter divides by the rate.
+    """
+    if config.api_concurrency <= 0:
+        msg = f"api_concurrency должен быть больше нуля, а не {config.api_concurrency}"
+        raise ConfigError(msg)
+    if config.api_rate_limit <= 0:
+        msg = f"api_rate_limit должен быть больше нуля, а не {config.api_rate_limit}"
+        raise ConfigError(msg)
+
 
 def load_config(path: Path) -> Config:
     retort = Retort()
     with path.open("rb") as f:
         data = tomllib.load(f)
-        return retort.load(data, Config)
+        config = retort.load(data, Config)
+    check_config(config)
+    return config
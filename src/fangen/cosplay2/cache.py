@@ -0,0 +1,89 @@
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+    from pathlib import Path
+
+# Bytes read at a time when replaying a cached payload.
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class CacheMissError(LookupError):
+    """Raised in offline mode when a payload was never cached."""
+
+
+class ResponseCache:
+    """Raw Cosplay2 API payloads on disk, with their validators.
+
+    Each call is stored as ``<key>.json`` (the body exactly as received) plus
+    ``<key>.meta.json`` holding the ``ETag``/``Last-Modified`` headers, which
+    are sent back as ``If-None-Match``/``If-Modified-Since`` next time.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, payload: Mapping[str, object] | None = None) -> str:
+        key = endpoint.replace("/", ".")
+        if payload:
+            digest = hashlib.sha256(
+                json.dumps(payload, sort_keys=True).encode()
+            ).hexdigest()
+            key += f"-{digest[:16]}"
+        return key
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.meta.json"
+
+    def conditional_headers(self, key: str) -> dict[str, str]:
+        """Validators for a conditional request, if ``key`` is cached."""
+        meta_path = self._meta_path(key)
+        if not meta_path.exists() or not self._body_path(key).exists():
+            return {}
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def iter_body(self, key: str) -> Iterator[bytes]:
+        body_path = self._body_path(key)
+        if not body_path.exists():
+            msg = f"Ответ {key} отсутствует в кэше {self.directory}"
+            raise CacheMissError(msg)
+        with body_path.open("rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                yield chunk
+
+    def store(
+        self, key: str, headers: Mapping[str, str], chunks: Iterable[bytes]
+    ) -> Iterator[bytes]:
+        """Pass ``chunks`` through while writing them to the cache.
+
+        The entry is replaced only once the whole body has been read, so an
+        interrupted download never leaves a truncated payload behind.
+        """
+        body_path = self._body_path(key)
+        tmp_path = body_path.with_suffix(".tmp")
+        try:
+            with tmp_path.open("wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            tmp_path.replace(body_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        meta = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        self._meta_path(key).write_text(json.dumps(meta), encoding="utf-8")
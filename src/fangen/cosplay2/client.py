@@ -1,77 +1,135 @@
 import json
 import logging
-from typing import TYPE_CHECKING
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
 
 from adaptix import Retort
 
+from fangen.common.profiling import profile
+from fangen.cosplay2.cache import ResponseCache
 from fangen.cosplay2.models.plan import PlanNodeDTO
 from fangen.cosplay2.models.request import RequestDTO
 from fangen.cosplay2.models.topic import TopicDTO, TopicWithFieldsDTO
 from fangen.cosplay2.models.value import RequestValueDTO
+from fangen.cosplay2.streaming import iter_json_array
 
 if TYPE_CHECKING:
-    from requests import Session
+    from collections.abc import Iterator
+
+    from fangen.cosplay2.transport import Transport
 
 logger = logging.getLogger(__name__)
 
 # Seconds to wait for connect/read before giving up on a Cosplay2 API call.
 DEFAULT_TIMEOUT = 30
 
+# Bytes read from the socket at a time when streaming a response.
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class Cosplay2Client:
     def __init__(
         self,
-        session: Session,
+        transport: Transport,
         api_key: str,
         api_secret: str,
         event_name: str,
         timeout: float = DEFAULT_TIMEOUT,
+        *,
+        base_url: str | None = None,
+        cache: ResponseCache | None = None,
+        offline: bool = False,
     ) -> None:
-        self.session = session
+        if offline and cache is None:
+            msg = "Offline mode needs a response cache to replay from"
+            raise ValueError(msg)
+        self.transport = transport
         self.timeout = timeout
-        self.base_url = f"https://{event_name}.cosplay2.ru/api/"
+        # Anything else than the event's own API is a stand-in for testing,
+        # such as fangen.bench.fake_server.
+        self.base_url = (
+            base_url.rstrip("/") + "/"
+            if base_url
+            else f"https://{event_name}.cosplay2.ru/api/"
+        )
         self.headers = {
             "X-API-Key": f"{api_key}",
             "X-API-Secret": f"{api_secret}",
         }
         self.retort = Retort(strict_coercion=False)
+        self.cache = cache
+        self.offline = offline
+
+    def _fetch(
+        self, endpoint: str, payload: dict[str, str] | None = None
+    ) -> Iterator[bytes]:
+        """Yield the raw body of an API call chunk by chunk.
+
+        Calls with a ``payload`` are POSTed as JSON, the rest are GETs. With a
+        cache, the request is made conditional and a ``304 Not Modified`` is
+        answered from disk; offline, the cache is the only source.
+        """
+        key = ResponseCache.key(endpoint, payload)
+        if self.cache is not None and self.offline:
+            yield from self.cache.iter_body(key)
+            return
+
+        headers = dict(self.headers)
+        if self.cache is not None:
+            headers.update(self.cache.conditional_headers(key))
+        with self.transport.request(
+            "POST" if payload is not None else "GET",
+            self.base_url + endpoint,
+            endpoint=endpoint,
+            json=payload,
+            headers=headers,
+            timeout=self.timeout,
+            stream=True,
+        ) as response:
+            if (
+                self.cache is not None
+                and response.status_code == HTTPStatus.NOT_MODIFIED
+            ):
+                logger.debug("%s не изменился, берём ответ из кэша", endpoint)
+                yield from self.cache.iter_body(key)
+                return
+            response.raise_for_status()
+            chunks = response.iter_content(STREAM_CHUNK_SIZE)
+            if self.cache is not None:
+                chunks = self.cache.store(key, response.headers, chunks)
+            for chunk in chunks:
+                profile.record_http(len(chunk))
+                yield chunk
+
+    def _load(self, endpoint: str, payload: dict[str, str] | None = None) -> Any:  # noqa: ANN401 - arbitrary JSON, typed by the retort afterwards
+        return json.loads(b"".join(self._fetch(endpoint, payload)))
 
     def get_list(self) -> list[TopicDTO]:
-        url = self.base_url + "topics/get_list"
-        response = self.session.get(url=url, headers=self.headers, timeout=self.timeout)
-        response.raise_for_status()
-        data = response.json()
+        data = self._load("topics/get_list")
         return self.retort.load(data, list[TopicDTO])
 
     def get_plan(self) -> list[PlanNodeDTO]:
-        url = self.base_url + "events/get_plan"
-        response = self.session.get(url=url, headers=self.headers, timeout=self.timeout)
-        response.raise_for_status()
-        data: str = response.json()["plan"]
+        data: str = self._load("events/get_plan")["plan"]
         return self.retort.load(json.loads(data), list[PlanNodeDTO])
 
     def get_all_requests(self) -> list[RequestDTO]:
-        url = self.base_url + "topics/get_all_requests"
-        response = self.session.get(url=url, headers=self.headers, timeout=self.timeout)
-        response.raise_for_status()
-        data = response.json()
+        data = self._load("topics/get_all_requests")
         return self.retort.load(data, list[RequestDTO])
 
     def get_all_values(self) -> list[RequestValueDTO]:
-        url = self.base_url + "requests/get_all_values"
-        response = self.session.get(url=url, headers=self.headers, timeout=self.timeout)
-        response.raise_for_status()
-        data = response.json()
+        data = self._load("requests/get_all_values")
         return self.retort.load(data, list[RequestValueDTO])
 
+    def iter_all_values(self) -> Iterator[RequestValueDTO]:
+        """Stream ``requests/get_all_values`` one value at a time.
+
+        The payload is decoded incrementally, so neither the raw response nor
+        the full value list is ever held in memory.
+        """
+        load_value = self.retort.get_loader(RequestValueDTO)
+        for item in iter_json_array(self._fetch("requests/get_all_values")):
+            yield load_value(item)
+
     def get_with_fields(self, topic_url_code: str) -> TopicWithFieldsDTO:
-        url = self.base_url + "topics/get_with_fields"
-        response = self.session.post(
-            url=url,
-            json={"topic_url_code": topic_url_code},
-            headers=self.headers,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = self._load("topics/get_with_fields", {"topic_url_code": topic_url_code})
         return self.retort.load(data, TopicWithFieldsDTO)
@@ -0,0 +1,12 @@
+# Defaults of the Cosplay2 API tuning options. Kept apart from the client and
+# the transport so that loading the config does not import `requests`.
+
+# Cosplay2 API calls allowed in flight at once. Kept low on purpose so a sync
+# stays polite to the shared Cosplay2 servers.
+DEFAULT_CONCURRENCY = 4
+
+# Requests per second allowed by default.
+DEFAULT_RATE_LIMIT = 5.0
+
+# Retries per call before giving up.
+DEFAULT_MAX_RETRIES = 5
@@ -0,0 +1,108 @@
+import codecs
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class _TextBuffer:
+    """Decoded text of a byte stream, read on demand one chunk at a time."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at the end."""
+        if self.exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            decoded = self._utf8.decode(b"", final=True)
+        else:
+            decoded = self._utf8.decode(chunk)
+        self.text = self.text[self.pos :] + decoded
+        self.pos = 0
+        return True
+
+    def next_char(self, start: int | None = None) -> str | None:
+        """Skip whitespace from ``start`` (default: ``pos``) and peek a char.
+
+        Without ``start`` the position is advanced and more chunks are read as
+        needed; with it only the already buffered text is inspected.
+        """
+        if start is not None:
+            while start < len(self.text) and self.text[start] in _WHITESPACE:
+                start += 1
+            return self.text[start] if start < len(self.text) else None
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+
+def _finish(buffer: _TextBuffer) -> None:
+    """Consume the stream past the closing bracket, rejecting trailing data.
+
+    Reading to the end also lets wrappers around ``chunks`` (such as the
+    response cache) see the complete body.
+    """
+    buffer.pos += 1
+    if buffer.next_char() is not None:
+        msg = "Unexpected data after the JSON array"
+        raise ValueError(msg)
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[object]:
+    """Yield the items of a top-level JSON array as its bytes arrive.
+
+    Only one item (plus whatever is left of the current chunk) is held in
+    memory at a time, unlike ``json.loads`` on the whole payload.
+    """
+    decoder = json.JSONDecoder()
+    buffer = _TextBuffer(chunks)
+
+    if buffer.next_char() != "[":
+        msg = "Expected a JSON array"
+        raise ValueError(msg)
+    buffer.pos += 1
+    if buffer.next_char() == "]":
+        _finish(buffer)
+        return
+
+    while True:
+        try:
+            item, end = decoder.raw_decode(buffer.text, buffer.pos)
+        except json.JSONDecodeError:
+            # The item is split across chunks: read more and retry.
+            if not buffer.fill():
+                raise
+            continue
+        if not buffer.exhausted and buffer.next_char(end) not in {",", "]"}:
+            # A number cut by a chunk boundary ("15" + "00.5") decodes as a
+            # shorter one, so only accept an item once its terminator is
+            # buffered.
+            buffer.fill()
+            continue
+        buffer.pos = end
+        yield item
+
+        separator = buffer.next_char()
+        if separator == "]":
+            _finish(buffer)
+            return
+        if separator != ",":
+            msg = f"Expected ',' or ']' in JSON array, got {separator!r}"
+            raise ValueError(msg)
+        buffer.pos += 1
+        buffer.next_char()
@@ -0,0 +1,208 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from requests import ConnectionError as RequestsConnectionError
+from requests import Timeout
+from requests.adapters import HTTPAdapter
+from rich.table import Table
+
+from fangen.common.profiling import profile
+from fangen.cosplay2.defaults import DEFAULT_MAX_RETRIES, DEFAULT_RATE_LIMIT
+
+if TYPE_CHECKING:
+    from requests import Response, Session
+
+logger = logging.getLogger(__name__)
+
+# Responses worth another try: rate limiting and transient server trouble.
+RETRYABLE_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+# How many requests may go out back to back.
+DEFAULT_BURST = 5
+
+# Backoff bounds in seconds.
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# The rate never drops below this share of the configured one after 429s.
+MIN_RATE_SHARE = 0.1
+# Share of the configured rate regained after every successful call.
+RECOVERY_SHARE = 0.05
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an adaptive refill rate.
+
+    Every 429 halves the rate (down to ``MIN_RATE_SHARE`` of the configured
+    one) and every success nudges it back up, so concurrent workers settle on
+    whatever the server actually tolerates.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self) -> None:
+        with self._lock:
+            self.rate = max(self.rate / 2, self.max_rate * MIN_RATE_SHARE)
+
+    def recover(self) -> None:
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate * RECOVERY_SHARE, self.max_rate)
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+
+class Transport:
+    """HTTP layer of the Cosplay2 client: pooling, rate limiting and retries.
+
+    Retryable statuses and connection errors are retried with exponential
+    backoff and full jitter, honouring ``Retry-After`` when the server sends
+    one. Latency (time to response headers) and retries are tracked per
+    endpoint.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        pool_size: int,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        self.session = session
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.max_retries = max_retries
+        self.stats: dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(
+        self,
+        endpoint: str,
+        elapsed: float,
+        *,
+        retry: bool = False,
+        failure: bool = False,
+    ) -> None:
+        with self._stats_lock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            stats.record(elapsed)
+            stats.retries += retry
+            stats.failures += failure
+
+    @staticmethod
+    def _backoff(attempt: int, response: Response | None = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), BACKOFF_MAX)
+        # Full jitter: spreads out workers that failed at the same moment.
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))  # noqa: S311
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: str,
+        **kwargs: Any,  # noqa: ANN401 - passed through to requests
+    ) -> Response:
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            started = time.perf_counter()
+            profile.record_http(call=True)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (RequestsConnectionError, Timeout) as e:
+                elapsed = time.perf_counter() - started
+                if attempt >= self.max_retries:
+                    self._record(endpoint, elapsed, failure=True)
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("%s: %s, повтор через %.1f с", endpoint, e, delay)
+            else:
+                elapsed = time.perf_counter() - started
+                if response.status_code not in RETRYABLE_STATUSES:
+                    self._record(endpoint, elapsed)
+                    self.bucket.recover()
+                    return response
+                if attempt >= self.max_retries:
+                    self._record(endpoint, elapsed, failure=True)
+                    return response
+                if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+                    self.bucket.throttle()
+                delay = self._backoff(attempt, response)
+                response.close()
+                logger.warning(
+                    "%s: HTTP %s, повтор через %.1f с",
+                    endpoint,
+                    response.status_code,
+                    delay,
+                )
+            self._record(endpoint, elapsed, retry=True)
+            attempt += 1
+            time.sleep(delay)
+
+    def stats_table(self) -> Table:
+        table = Table(title="🌐 Запросы к Cosplay2")
+        table.add_column("Метод")
+        for column in ("Вызовов", "Повторов", "Ошибок", "Среднее, с", "Макс., с"):
+            table.add_column(column, justify="right")
+        for endpoint, stats in sorted(self.stats.items()):
+            table.add_row(
+                endpoint,
+                str(stats.calls),
+                str(stats.retries),
+                str(stats.failures),
+                f"{stats.total_time / stats.calls:.2f}" if stats.calls else "-",
+                f"{stats.max_time:.2f}",
+            )
+        return table
@@ -0,0 +1,423 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, literal_column, or_, select
+
+from fangen.common.data import (
+    RequestDataCache,
+    format_value,
+    get_node_base_data,
+    merge_value,
+)
+from fangen.common.profiling import profile
+from fangen.cosplay2.models.vo import PlanNodeType, RequestStatus
+from fangen.db.models import Request, RequestFile, RequestValue, Topic, TopicField
+from fangen.db.models.node import PlanNode
+from fangen.db.models.topic import TopicSection
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from sqlalchemy import ColumnElement, Select
+    from sqlalchemy.orm import Session
+
+    from fangen.common.data import NodeData, NodeValue
+
+
+@dataclass(frozen=True, slots=True)
+class TopicRow:
+    id: int
+    title: str
+    card_code: str
+    # Field titles in sheet order: by section, then by field.
+    fields: list[str]
+
+
+def build_request_data(
+    topic: TopicRow | None,
+    voting_number: int | None,
+    voting_title: str | None,
+    fields: Iterable[tuple[str, NodeValue]],
+) -> NodeData:
+    """Template data of a request from its fields, merged per title."""
+    data: NodeData = {
+        "info": voting_title,
+        "title": voting_title,
+        "code": topic.card_code if topic else None,
+        "topic_title": topic.title if topic else None,
+        "card": voting_number,
+    }
+    for field, value in fields:
+        if field not in data:
+            data[field] = value
+            continue
+        # A field named like one of the keys above: merge one by one.
+        for item in value if isinstance(value, list) else (value,):
+            data[field] = merge_value(data[field], item)
+    return data
+
+
+@dataclass(frozen=True, slots=True)
+class PlanRow:
+    uid: str
+    type: PlanNodeType
+    title: str
+    request_length: int | None
+    time_start: int | None
+    time_end: int | None
+    topic: TopicRow | None
+    # Row of the node's request in the dataset, if it has one.
+    request: int | None
+
+
+class Dataset:
+    """Requests, their values and the plan, loaded without ORM objects.
+
+    Requests are rows addressed by index (in id order). Per-request
+    attributes are parallel arrays, and values are pivoted into one column
+    per field title: ``columns[title][row]`` holds the rendered value, a
+    list for multi-value fields, or ``None``. Titles are interned, so each
+    distinct one is stored once however many requests use it.
+    """
+
+    def __init__(self) -> None:
+        self.request_ids = array("q")
+        self.topic_ids = array("q")
+        self.voting_numbers: list[int | None] = []
+        self.voting_titles: list[str | None] = []
+        # Rows of approved requests by topic, in id order.
+        self.approved: dict[int, array[int]] = {}
+        # In Cosplay2 order, which is also the sheet order of make_data.
+        self.topics: dict[int, TopicRow] = {}
+        self.columns: dict[str, list[NodeValue]] = {}
+        # Field titles of each request, in value order.
+        self.request_fields: list[tuple[str, ...]] = []
+        self.plan: list[PlanRow] = []
+        self.plan_requests = array("q")  # rows of request nodes, in plan order
+        self.request_data_cache = RequestDataCache()
+
+    def __len__(self) -> int:
+        return len(self.request_ids)
+
+    def _build_request_data(self, row: int) -> NodeData:
+        return build_request_data(
+            self.topics.get(self.topic_ids[row]),
+            self.voting_numbers[row],
+            self.voting_titles[row],
+            ((field, self.columns[field][row]) for field in self.request_fields[row]),
+        )
+
+    def request_data(self, row: int) -> NodeData:
+        """Template data of a request, as the exporters fill templates with.
+
+        Shared with ``request_data_cache``, so copy it before modifying.
+        """
+        return self.request_data_cache.get(row, lambda: self._build_request_data(row))
+
+    def node_data(self, node: PlanRow) -> NodeData:
+        data = get_node_base_data(node)
+        if node.type is PlanNodeType.REQUEST and node.request is not None:
+            data.update(self.request_data(node.request))
+        return data
+
+    def approved_requests(self) -> list[int]:
+        """Rows of all approved requests, by id."""
+        return sorted(row for rows in self.approved.values() for row in rows)
+
+
+# Cosplay2 order of the topics, which is also the sheet order of make_data.
+_TOPIC_ORDER = (Topic.order, Topic.id)
+
+
+def load_topics(session: Session) -> dict[int, TopicRow]:
+    """Topics with the titles of their fields, in Cosplay2 order."""
+    fields: dict[int, list[str]] = {}
+    stmt = (
+        select(TopicSection.topic_id, TopicField.title)
+        .join(TopicField, TopicField.section_id == TopicSection.id)
+        .order_by(TopicSection.topic_id, TopicSection.order, TopicField.order)
+    )
+    for topic_id, title in session.execute(stmt):
+        fields.setdefault(topic_id, []).append(sys.intern(title))
+
+    stmt = select(Topic.id, Topic.title, Topic.card_code).order_by(*_TOPIC_ORDER)
+    return {
+        topic_id: TopicRow(topic_id, title, card_code, fields.get(topic_id, []))
+        for topic_id, title, card_code in session.execute(stmt)
+    }
+
+
+def wanted_requests() -> ColumnElement[bool]:
+    """Everything a command can show: approved requests and those in the plan."""
+    return or_(
+        Request.status == RequestStatus.APPROVED,
+        Request.id.in_(select(PlanNode.request_id)),
+    )
+
+
+def _load_requests(
+    session: Session, dataset: Dataset, wanted: ColumnElement[bool]
+) -> dict[int, int]:
+    stmt = (
+        select(
+            Request.id,
+            Request.topic_id,
+            Request.status,
+            Request.voting_number,
+            Request.voting_title,
+        )
+        .where(wanted)
+        .order_by(Request.id)
+    )
+    rows: dict[int, int] = {}
+    for row, (request_id, topic_id, status, number, title) in enumerate(
+        session.execute(stmt)
+    ):
+        rows[request_id] = row
+        dataset.request_ids.append(request_id)
+        dataset.topic_ids.append(topic_id)
+        dataset.voting_numbers.append(number)
+        dataset.voting_titles.append(title)
+        if status is RequestStatus.APPROVED:
+            dataset.approved.setdefault(topic_id, array("q")).append(row)
+    return rows
+
+
+def _load_values(
+    session: Session,
+    dataset: Dataset,
+    rows: dict[int, int],
+    wanted: ColumnElement[bool],
+) -> None:
+    stmt = (
+        select(
+            RequestValue.request_id,
+            RequestValue.title,
+            RequestValue.type,
+            RequestValue.value,
+            RequestValue.checkbox,
+            RequestValue.duration_seconds,
+            RequestFile.url,
+        )
+        .outerjoin(RequestFile, RequestFile.value_id == RequestValue.id)
+        .where(RequestValue.request_id.in_(select(Request.id).where(wanted)))
+        .order_by(RequestValue.request_id, RequestValue.id)
+    )
+    size = len(dataset)
+    columns = dataset.columns
+    request_fields: list[tuple[str, ...]] = [()] * size
+    current_row = -1
+    current_fields: list[str] = []
+    for (
+        request_id,
+        title,
+        value_type,
+        value,
+        checkbox,
+        duration,
+        url,
+    ) in session.execute(stmt):
+        row = rows[request_id]
+        if row != current_row:
+            if current_row >= 0:
+                request_fields[current_row] = tuple(current_fields)
+            current_row = row
+            current_fields = []
+        field = sys.intern(title)
+        column = columns.get(field)
+        if column is None:
+            column = columns[field] = [None] * size
+        if field not in current_fields:
+            current_fields.append(field)
+        rendered = format_value(
+            value_type,
+            value,
+            checkbox=checkbox,
+            duration_seconds=duration,
+            url=url,
+        )
+        column[row] = merge_value(column[row], rendered)
+    if current_row >= 0:
+        request_fields[current_row] = tuple(current_fields)
+    dataset.request_fields = request_fields
+
+
+# Plan order of Dataset.plan and of the streamed summary, so both list nodes
+# of the same start time alike. Ties are broken by rowid: the plan is inserted
+# parents first (see iter_plan_rows), so a topic stays ahead of its first
+# request, which starts at the same time. It also keeps the values of each
+# node together in the stream.
+_PLAN_ORDER = (
+    PlanNode.time_start,
+    literal_column(f"{PlanNode.__tablename__}.rowid"),
+)
+
+
+def _load_plan(session: Session, dataset: Dataset, rows: dict[int, int]) -> None:
+    stmt = select(
+        PlanNode.uid,
+        PlanNode.type,
+        PlanNode.title,
+        PlanNode.request_length,
+        PlanNode.time_start,
+        PlanNode.time_end,
+        PlanNode.topic_id,
+        PlanNode.request_id,
+    ).order_by(*_PLAN_ORDER)
+    for (
+        uid,
+        node_type,
+        title,
+        request_length,
+        time_start,
+        time_end,
+        topic_id,
+        request_id,
+    ) in session.execute(stmt).tuples():
+        request = rows.get(request_id) if request_id is not None else None
+        plan_row = PlanRow(
+            uid=uid,
+            type=node_type,
+            title=title,
+            request_length=request_length,
+            time_start=time_start,
+            time_end=time_end,
+            topic=dataset.topics.get(topic_id) if topic_id is not None else None,
+            request=request,
+        )
+        dataset.plan.append(plan_row)
+        if plan_row.type is PlanNodeType.REQUEST and request is not None:
+            dataset.plan_requests.append(request)
+
+
+def load_dataset(session: Session) -> Dataset:
+    """Load everything make_plan and move_files need in a few flat SELECTs."""
+    dataset = Dataset()
+    wanted = wanted_requests()
+    dataset.topics = load_topics(session)
+    rows = _load_requests(session, dataset, wanted)
+    _load_values(session, dataset, rows, wanted)
+    _load_plan(session, dataset, rows)
+    profile.track_cache(dataset.request_data_cache)
+    return dataset
+
+
+# Rows fetched at a time by the streaming queries; without it, the ORM session
+# buffers the whole result before the first row.
+STREAM_BATCH_SIZE = 1000
+
+
+def stream_summary_headers(session: Session) -> list[str]:
+    """All field titles of the requests in the plan, in first-seen order."""
+    stmt = (
+        select(RequestValue.title)
+        .join(PlanNode, PlanNode.request_id == RequestValue.request_id)
+        .join(Request, Request.id == RequestValue.request_id)
+        .where(PlanNode.type == PlanNodeType.REQUEST)
+        .order_by(*_PLAN_ORDER, RequestValue.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    headers = ["info"]
+    seen = {"info"}
+    for (title,) in session.execute(stmt):
+        if title not in seen:
+            seen.add(title)
+            headers.append(title)
+    return headers
+
+
+# What a streamed request is built from, after a column that tells the
+# requests apart: one row per value, or a single row of NULL values for a
+# request without any.
+_STREAM_COLUMNS = (
+    Request.topic_id,
+    Request.voting_number,
+    Request.voting_title,
+    RequestValue.title,
+    RequestValue.type,
+    RequestValue.value,
+    RequestValue.checkbox,
+    RequestValue.duration_seconds,
+    RequestFile.url,
+)
+
+
+def _stream_requests(
+    session: Session, stmt: Select, topics: dict[int, TopicRow]
+) -> Iterator[tuple[int, NodeData]]:
+    """Topic id and template data of each request of ``stmt``, one at a time.
+
+    ``stmt`` selects a request key and ``_STREAM_COLUMNS``, ordered so that
+    the rows of a request come one after another.
+    """
+    rows = session.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+    for (_, topic_id, voting_number, voting_title), request_rows in groupby(
+        rows.tuples(), key=itemgetter(0, 1, 2, 3)
+    ):
+        fields: dict[str, NodeValue] = {}
+        for *_, title, value_type, value, checkbox, duration, url in request_rows:
+            if title is None:  # A request without values
+                continue
+            field = sys.intern(title)
+            rendered = format_value(
+                value_type,
+                value,
+                checkbox=checkbox,
+                duration_seconds=duration,
+                url=url,
+            )
+            fields[field] = merge_value(fields.get(field), rendered)
+        yield (
+            topic_id,
+            build_request_data(
+                topics.get(topic_id), voting_number, voting_title, fields.items()
+            ),
+        )
+
+
+def stream_summary_data(
+    session: Session, topics: dict[int, TopicRow] | None = None
+) -> Iterator[NodeData]:
+    """Template data of the requests in the plan, one request at a time.
+
+    The same as ``Dataset.request_data`` of ``plan_requests``, but only the
+    values of the current request are held in memory.
+    """
+    if topics is None:
+        topics = load_topics(session)
+    stmt = (
+        select(PlanNode.uid, *_STREAM_COLUMNS)
+        .join(Request, Request.id == PlanNode.request_id)
+        .outerjoin(RequestValue, RequestValue.request_id == Request.id)
+        .outerjoin(RequestFile, RequestFile.value_id == RequestValue.id)
+        .where(PlanNode.type == PlanNodeType.REQUEST)
+        .order_by(*_PLAN_ORDER, RequestValue.id)
+    )
+    for _, data in _stream_requests(session, stmt, topics):
+        yield data
+
+
+def stream_topic_data(
+    session: Session, topics: dict[int, TopicRow], topic_id: int | None = None
+) -> Iterator[tuple[int, NodeData]]:
+    """Topic id and template data of every approved request, one at a time.
+
+    Requests come topic by topic, in the order of ``topics``, and by id
+    within a topic; with ``topic_id``, only those of that topic.
+    """
+    wanted = Request.status == RequestStatus.APPROVED
+    if topic_id is not None:
+        wanted = and_(wanted, Request.topic_id == topic_id)
+    stmt = (
+        select(Request.id, *_STREAM_COLUMNS)
+        .join(Topic, Topic.id == Request.topic_id)
+        .outerjoin(RequestValue, RequestValue.request_id == Request.id)
+        .outerjoin(RequestFile, RequestFile.value_id == RequestValue.id)
+        .where(wanted)
+        .order_by(*_TOPIC_ORDER, Request.id, RequestValue.id)
+    )
+    return _stream_requests(session, stmt, topics)
@@ -1,21 +1,113 @@
+import functools
 from typing import TYPE_CHECKING
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from fangen.db.models import Base
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
     from pathlib import Path
+    from sqlite3 import Connection
+
+# Stored in PRAGMA user_version by create_db and bumped whenever the tables
+# change, so an incremental sync never writes into an outdated layout.
+SCHEMA_VERSION = 2
+
+# Applied to every new SQLite connection:
+# - WAL lets readers keep working while a sync writes, and with
+#   synchronous=NORMAL commits no longer wait for an fsync per transaction
+#   (still safe against application crashes, which is all a rebuildable
+#   cache of Cosplay2 data needs);
+# - a 64 MiB page cache (negative = KiB) and 256 MiB of memory-mapped I/O
+#   keep the whole DB of a typical event in memory during exports;
+# - temporary b-trees for ORDER BY / GROUP BY stay in RAM.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Read-only connections skip the pragmas that change the database file
+# (the journal mode is persistent and set by the writer) and refuse writes
+# at the SQLite level on top of the read-only open mode.
+READ_ONLY_PRAGMAS = {
+    "cache_size": SQLITE_PRAGMAS["cache_size"],
+    "mmap_size": SQLITE_PRAGMAS["mmap_size"],
+    "temp_store": SQLITE_PRAGMAS["temp_store"],
+    "query_only": "ON",
+}
+
+
+def _pragma_listener(
+    pragmas: Mapping[str, object],
+) -> Callable[[Connection, object], None]:
+    def apply_pragmas(dbapi_connection: Connection, _connection_record: object) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return apply_pragmas
+
+
+def make_engine(db_path: Path, *, read_only: bool = False) -> Engine:
+    """Build a new engine; most callers want the shared ``get_engine``."""
+    if read_only:
+        # mode=ro opens the file without write access and fails instead of
+        # creating an empty database when the file is missing.
+        url = f"sqlite:///file:{db_path.absolute()}?mode=ro&uri=true"
+        pragmas = READ_ONLY_PRAGMAS
+    else:
+        url = f"sqlite:///{db_path.absolute()}"
+        pragmas = SQLITE_PRAGMAS
+    engine = create_engine(url=url)
+    event.listen(engine, "connect", _pragma_listener(pragmas))
+    return engine
+
+
+@functools.cache
+def _shared_engine(db_path: Path, *, read_only: bool) -> Engine:
+    return make_engine(db_path, read_only=read_only)
+
+
+def get_engine(db_path: Path, *, read_only: bool = False) -> Engine:
+    """Engine shared by every caller of the same database file and mode.
+
+    It is created on first use and keeps its connection pool for the rest of
+    the process.
+    """
+    return _shared_engine(db_path.absolute(), read_only=read_only)
 
 
 def create_db(db_path: Path) -> None:
-    engine = create_engine(url=f"sqlite:///{db_path.absolute()}")
+    engine = get_engine(db_path)
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+def has_current_schema(db_path: Path) -> bool:
+    """Whether ``db_path`` exists and was created with this ``SCHEMA_VERSION``."""
+    if not db_path.exists():
+        return False
+    with get_engine(db_path).connect() as connection:
+        version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+    return version == SCHEMA_VERSION
+
 
+def get_session(db_path: Path, *, read_only: bool = False) -> Session:
+    """Open a session on the shared engine.
 
-def get_session(db_path: Path) -> Session:
-    engine = create_engine(url=f"sqlite:///{db_path.absolute()}")
-    sm = sessionmaker(bind=engine)
+    Exporters pass ``read_only=True``: such sessions cannot modify the
+    database, so any number of them may run alongside a ``make_db`` sync.
+    """
+    if read_only and not db_path.exists():
+        msg = f"База данных {db_path} не найдена, сначала выполните make_db"
+        raise FileNotFoundError(msg)
+    sm = sessionmaker(bind=get_engine(db_path, read_only=read_only))
     return sm()
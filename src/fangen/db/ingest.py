@@ -0,0 +1,210 @@
+from itertools import batched
+from typing import TYPE_CHECKING
+
+from sqlalchemy import insert
+
+from fangen.common.utils import build_cosplay2_file_link, build_cosplay2_image_link
+from fangen.common.values import (
+    FILE_VALUE_TYPES,
+    parse_checkbox_value,
+    parse_duration_value,
+    parse_file_value,
+    parse_image_value,
+    parse_number_value,
+)
+from fangen.cosplay2.models.vo import ValueType
+from fangen.db.models import Request, RequestFile, RequestValue
+from fangen.db.models.node import PlanNode
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    from sqlalchemy import Insert
+    from sqlalchemy.orm import Session
+
+    from fangen.cosplay2.models.plan import PlanNodeDTO
+    from fangen.cosplay2.models.request import RequestDTO
+    from fangen.cosplay2.models.topic import TopicDTO
+    from fangen.cosplay2.models.value import RequestValueDTO
+    from fangen.db.models.base import Base
+
+Row = dict[str, object]
+
+# `make_db` writes rows straight from the Cosplay2 DTOs as plain dicts with
+# executemany-style INSERTs, skipping ORM object construction and unit-of-work
+# bookkeeping. Rows per executemany() call: large enough to amortise statement
+# overhead, small enough to keep a batch of row dicts cheap to hold in memory.
+BATCH_SIZE = 5000
+
+
+def request_row(dto: RequestDTO) -> Row:
+    return {
+        "id": dto.id,
+        "topic_id": dto.topic_id,
+        "status": dto.status,
+        "update_time": dto.update_time,
+        "number": dto.number,
+        "user_title": dto.user_title,
+        "voting_number": dto.voting_number,
+        "voting_title": dto.voting_title,
+    }
+
+
+def request_event_ids(
+    requests: Iterable[RequestDTO], topics: Iterable[TopicDTO]
+) -> dict[int, int]:
+    """Map request id -> event id, needed to resolve uploaded file URLs."""
+    topic_events = {topic.id: topic.event_id for topic in topics}
+    return {
+        request.id: topic_events[request.topic_id]
+        for request in requests
+        if request.topic_id in topic_events
+    }
+
+
+def value_row(value_id: int, dto: RequestValueDTO) -> Row:
+    row: Row = {
+        "id": value_id,
+        "request_id": dto.request_id,
+        "title": dto.title,
+        "type": dto.type,
+        "value": dto.value,
+        "duration_seconds": None,
+        "checkbox": None,
+        "number": None,
+    }
+    if dto.value is None:
+        return row
+    try:
+        match dto.type:
+            case ValueType.DURATION:
+                row["duration_seconds"] = int(parse_duration_value(dto).total_seconds())
+            case ValueType.CHECKBOX:
+                row["checkbox"] = parse_checkbox_value(dto)
+            case ValueType.NUM:
+                row["number"] = parse_number_value(dto)
+    except ValueError, OverflowError:
+        # Unparseable input keeps only the raw string.
+        pass
+    return row
+
+
+def file_row(value_id: int, dto: RequestValueDTO, event_id: int | None) -> Row:
+    """Unpack a FILE/IMAGE value; fields it does not provide stay ``None``."""
+    row: Row = {
+        "value_id": value_id,
+        "request_id": dto.request_id,
+        "title": dto.title,
+        "kind": dto.type,
+        "filename": None,
+        "filesize": None,
+        "fileext": None,
+        "url": None,
+    }
+    if dto.value is None:
+        return row
+    try:
+        if dto.type is ValueType.IMAGE:
+            image_value = parse_image_value(dto)
+            row["filename"] = image_value.filename
+            if event_id is not None:
+                row["url"] = build_cosplay2_image_link(
+                    event_id, dto.request_id, image_value.filename
+                )
+            return row
+        file_value = parse_file_value(dto)
+    except KeyError, TypeError, ValueError:
+        # Malformed JSON: keep the row so the value is still reported.
+        return row
+    row["filename"] = file_value.filename
+    row["filesize"] = file_value.filesize
+    row["fileext"] = file_value.fileext
+    if not file_value.filename:
+        row["url"] = file_value.link
+    elif event_id is not None:
+        row["url"] = build_cosplay2_file_link(
+            event_id, dto.request_id, file_value.filename
+        )
+    return row
+
+
+def iter_plan_rows(
+    nodes: Iterable[PlanNodeDTO], parent_id: str | None = None
+) -> Iterator[Row]:
+    """Flatten the plan tree into rows, parents before their children."""
+    for node in nodes:
+        yield {
+            "uid": node.uid,
+            "type": node.type,
+            "title": node.title,
+            "request_length": node.request_length,
+            "time_start": node.time_start,
+            "time_end": node.time_end,
+            "request_id": node.request_id,
+            "topic_id": node.topic_id,
+            "parent_id": parent_id,
+        }
+        if node.nodes:
+            yield from iter_plan_rows(node.nodes, node.uid)
+
+
+def bulk_insert(model: type[Base]) -> Insert:
+    """A Core INSERT into ``model``'s table, run as one executemany per batch.
+
+    Core rather than ``insert(model)``: the ORM bulk path handles every row
+    dict in Python first, which makes a full make_db about 30% slower.
+    """
+    return insert(model.metadata.tables[model.__tablename__])
+
+
+def insert_rows(
+    session: Session,
+    model: type[Base],
+    rows: Iterable[Row],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Insert ``rows`` into ``model``'s table in batches; return the row count."""
+    count = 0
+    for batch in batched(rows, batch_size, strict=False):
+        session.execute(bulk_insert(model), list(batch))
+        count += len(batch)
+    return count
+
+
+def insert_requests(session: Session, requests: Iterable[RequestDTO]) -> int:
+    return insert_rows(session, Request, map(request_row, requests))
+
+
+def insert_values(
+    session: Session,
+    values: Iterable[RequestValueDTO],
+    event_ids: Mapping[int, int],
+    first_id: int = 1,
+) -> int:
+    """Insert ``values`` with ids from ``first_id`` on, plus their files rows.
+
+    Ids are assigned here rather than by SQLite so each FILE/IMAGE value can
+    be unpacked into ``files`` in the same pass, while its JSON is at hand.
+    """
+    count = 0
+    for batch in batched(values, BATCH_SIZE, strict=False):
+        value_rows = []
+        file_rows = []
+        for value_id, dto in enumerate(batch, first_id + count):
+            value_rows.append(value_row(value_id, dto))
+            if dto.type in FILE_VALUE_TYPES:
+                event_id = event_ids.get(dto.request_id)
+                file_rows.append(file_row(value_id, dto, event_id))
+        session.execute(bulk_insert(RequestValue), value_rows)
+        if file_rows:
+            session.execute(bulk_insert(RequestFile), file_rows)
+        count += len(batch)
+    return count
+
+
+def insert_plan(session: Session, plan: Iterable[PlanNodeDTO]) -> int:
+    # The whole tree goes out as a single executemany: plans are a few
+    # thousand nodes at most, and parent rows need no flush before children
+    # because the parent uid is known up front.
+    rows = list(iter_plan_rows(plan))
+    return insert_rows(session, PlanNode, rows, batch_size=max(len(rows), 1))
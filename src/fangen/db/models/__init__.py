@@ -1,6 +1,15 @@
 from fangen.db.models.base import Base
+from fangen.db.models.file import RequestFile
 from fangen.db.models.request import Request
 from fangen.db.models.topic import Topic, TopicField, TopicSection
 from fangen.db.models.value import RequestValue
 
-__all__ = ["Base", "Request", "RequestValue", "Topic", "TopicField", "TopicSection"]
+__all__ = [
+    "Base",
+    "Request",
+    "RequestFile",
+    "RequestValue",
+    "Topic",
+    "TopicField",
+    "TopicSection",
+]
@@ -0,0 +1,33 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+# mapped_column() de-stringifies this annotation via eval() at class-body
+# time, so it must be a real (non-TYPE_CHECKING) import.
+from fangen.cosplay2.models.vo import ValueType  # noqa: TC001
+from fangen.db.models.base import Base
+
+if TYPE_CHECKING:
+    from fangen.db.models import Request
+
+
+class RequestFile(Base):
+    """A FILE or IMAGE value with its JSON unpacked and its URL resolved.
+
+    Rows are written at ingest time, one per such value. ``url`` is ``None``
+    when nothing was attached or the value could not be parsed.
+    """
+
+    __tablename__ = "files"
+
+    value_id: Mapped[int] = mapped_column(ForeignKey("values.id"), primary_key=True)
+    request_id: Mapped[int] = mapped_column(ForeignKey("requests.id"), index=True)
+    title: Mapped[str] = mapped_column()
+    kind: Mapped[ValueType] = mapped_column()
+    filename: Mapped[str | None] = mapped_column()
+    filesize: Mapped[int | None] = mapped_column()
+    fileext: Mapped[str | None] = mapped_column()
+    url: Mapped[str | None] = mapped_column()
+
+    request: Mapped[Request] = relationship(viewonly=True)
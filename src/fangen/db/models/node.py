@@ -19,7 +19,7 @@ class PlanNode(Base):
     type: Mapped[PlanNodeType] = mapped_column()
     title: Mapped[str] = mapped_column()
     request_length: Mapped[int | None] = mapped_column()
-    time_start: Mapped[int | None] = mapped_column()
+    time_start: Mapped[int | None] = mapped_column(index=True)
     time_end: Mapped[int | None] = mapped_column()
 
     request_id: Mapped[int | None] = mapped_column(ForeignKey("requests.id"))
@@ -28,7 +28,7 @@ class PlanNode(Base):
     topic_id: Mapped[int | None] = mapped_column(ForeignKey("topics.id"))
     topic: Mapped[Topic | None] = relationship()
 
-    parent_id: Mapped[str | None] = mapped_column(ForeignKey("plan.uid"))
+    parent_id: Mapped[str | None] = mapped_column(ForeignKey("plan.uid"), index=True)
     nodes: Mapped[list[PlanNode]] = relationship(remote_side=[uid])
 
     @classmethod
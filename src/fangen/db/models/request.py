@@ -18,8 +18,8 @@ class Request(Base):
     __tablename__ = "requests"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    topic_id: Mapped[int] = mapped_column(ForeignKey("topics.id"))
-    status: Mapped[RequestStatus] = mapped_column()
+    topic_id: Mapped[int] = mapped_column(ForeignKey("topics.id"), index=True)
+    status: Mapped[RequestStatus] = mapped_column(index=True)
     update_time: Mapped[str] = mapped_column()
     number: Mapped[int] = mapped_column()
     user_title: Mapped[str] = mapped_column()
@@ -37,7 +37,7 @@ class TopicField(Base):
     __tablename__ = "topic_fields"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    section_id: Mapped[int] = mapped_column(ForeignKey("topic_sections.id"))
+    section_id: Mapped[int] = mapped_column(ForeignKey("topic_sections.id"), index=True)
     title: Mapped[str] = mapped_column()
     order: Mapped[int] = mapped_column()
     type: Mapped[ValueType] = mapped_column()
@@ -71,7 +71,7 @@ class Topic(Base):
         viewonly=True,
         secondary="topic_sections",
     )
-    requests: Mapped[list[Request]] = relationship(viewonly=True)
+    requests: Mapped[list[Request]] = relationship(viewonly=True, order_by="Request.id")
 
     @classmethod
     def from_dto(cls, dto: TopicDTO) -> Topic:
@@ -10,19 +10,26 @@ from fangen.db.models.base import Base
 
 if typing.TYPE_CHECKING:
     from fangen.cosplay2.models.value import RequestValueDTO
-    from fangen.db.models import Request
+    from fangen.db.models import Request, RequestFile
 
 
 class RequestValue(Base):
     __tablename__ = "values"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    request_id: Mapped[int] = mapped_column(ForeignKey("requests.id"))
+    request_id: Mapped[int] = mapped_column(ForeignKey("requests.id"), index=True)
     title: Mapped[str] = mapped_column()
     type: Mapped[ValueType] = mapped_column()
     value: Mapped[str | None] = mapped_column()
 
+    # Typed copies of ``value`` filled at ingest, for SQL aggregation and
+    # rendering without re-parsing; None for other types and bad input.
+    duration_seconds: Mapped[int | None] = mapped_column()
+    checkbox: Mapped[bool | None] = mapped_column()
+    number: Mapped[float | None] = mapped_column()
+
     request: Mapped[Request] = relationship(viewonly=True)
+    file: Mapped[RequestFile | None] = relationship(viewonly=True)
 
     @classmethod
     def from_dto(cls, dto: RequestValueDTO) -> RequestValue:
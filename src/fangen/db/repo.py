@@ -1,43 +1,36 @@
 from typing import TYPE_CHECKING
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, contains_eager, raiseload
 
 from fangen.cosplay2.models.vo import RequestStatus
-from fangen.db.models import Request, Topic
-from fangen.db.models.node import PlanNode
+from fangen.db.dataset import wanted_requests
+from fangen.db.models import Request, RequestFile
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+# Everything a query does not load raises on access, so a lazy load is an
+# immediate error rather than a silent query per row.
 
-def get_plan_nodes(session: Session) -> Sequence[PlanNode]:
-    stmt = (
-        select(PlanNode)
-        .order_by(PlanNode.time_start)
-        .options(
-            joinedload(PlanNode.nodes),
-            joinedload(PlanNode.topic),
-            joinedload(PlanNode.request).joinedload(Request.values),
-        )
-    )
-    return session.scalars(stmt).unique().all()
 
-
-def get_topics_with_approved_requests(session: Session) -> Sequence[Topic]:
-    stmt = select(Topic).options(
-        joinedload(Topic.fields),
-        joinedload(
-            Topic.requests.and_(Request.status == RequestStatus.APPROVED)
-        ).joinedload(Request.values),
+def get_files(session: Session) -> Sequence[RequestFile]:
+    """Files of the requests ``load_dataset`` loads, by request."""
+    stmt = (
+        select(RequestFile)
+        .where(RequestFile.request_id.in_(select(Request.id).where(wanted_requests())))
+        .order_by(RequestFile.request_id, RequestFile.value_id)
+        .options(raiseload("*"))
     )
-    return session.scalars(stmt).unique().all()
+    return session.scalars(stmt).all()
 
 
-def get_approved_requests(session: Session) -> Sequence[Request]:
+def get_approved_files(session: Session) -> Sequence[RequestFile]:
     stmt = (
-        select(Request)
+        select(RequestFile)
+        .join(RequestFile.request)
         .where(Request.status == RequestStatus.APPROVED)
-        .options(joinedload(Request.values))
+        .order_by(RequestFile.request_id, RequestFile.value_id)
+        .options(contains_eager(RequestFile.request), raiseload("*"))
     )
-    return session.scalars(stmt).unique().all()
+    return session.scalars(stmt).all()
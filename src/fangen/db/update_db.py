@@ -1,77 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from rich import print
 from rich.progress import track
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
 
-from fangen.db.factory import create_db, get_session
-from fangen.db.models import Request, RequestValue, Topic, TopicField, TopicSection
+from fangen.common.profiling import profile
+from fangen.cosplay2.defaults import DEFAULT_CONCURRENCY
+from fangen.db.factory import create_db, get_session, has_current_schema
+from fangen.db.ingest import (
+    insert_plan,
+    insert_requests,
+    insert_values,
+    request_event_ids,
+    request_row,
+)
+from fangen.db.models import (
+    Request,
+    RequestFile,
+    RequestValue,
+    Topic,
+    TopicField,
+    TopicSection,
+)
 from fangen.db.models.node import PlanNode
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
     from pathlib import Path
 
+    from sqlalchemy.orm import Session
+
     from fangen.cosplay2.client import Cosplay2Client
-    from fangen.cosplay2.models.plan import PlanNodeDTO
+    from fangen.cosplay2.models.request import RequestDTO
+    from fangen.cosplay2.models.value import RequestValueDTO
+
+
+@dataclass(slots=True)
+class SyncStats:
+    """Request counts of an incremental sync."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"новых: {self.inserted}, изменено: {self.updated}, "
+            f"без изменений: {self.unchanged}, удалено: {self.deleted}"
+        )
+
+
+def sync_requests(
+    session: Session,
+    requests: list[RequestDTO],
+    values: Iterable[RequestValueDTO],
+    event_ids: Mapping[int, int],
+) -> SyncStats:
+    """Bring the stored requests in line with ``requests``.
+
+    Request rows are upserted by ``id``, so status or title changes always land.
+    Values are rewritten only for new requests and for requests whose
+    ``update_time`` changed; requests that vanished upstream are deleted
+    together with their values and files.
+    """
+    stats = SyncStats()
+    stored = dict(
+        session.execute(select(Request.id, Request.update_time)).tuples().all()
+    )
+
+    changed_ids: set[int] = set()
+    for dto in requests:
+        if dto.id not in stored:
+            stats.inserted += 1
+            changed_ids.add(dto.id)
+        elif stored[dto.id] != dto.update_time:
+            stats.updated += 1
+            changed_ids.add(dto.id)
+        else:
+            stats.unchanged += 1
+
+    if requests:
+        rows = [request_row(dto) for dto in requests]
+        stmt = insert(Request)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Request.id],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in rows[0]
+                    if column != "id"
+                },
+            ),
+            rows,
+        )
 
+    vanished_ids = stored.keys() - {dto.id for dto in requests}
+    stats.deleted = len(vanished_ids)
 
-def make_db(client: Cosplay2Client, db_path: Path) -> None:
+    # New requests have no stored values yet, so deleting by the whole changed
+    # set is harmless and keeps this a single statement.
+    stale_ids = changed_ids | vanished_ids
+    if stale_ids:
+        for model in (RequestFile, RequestValue):
+            session.execute(delete(model).where(model.request_id.in_(stale_ids)))
+    if vanished_ids:
+        session.execute(delete(Request).where(Request.id.in_(vanished_ids)))
+
+    last_id = session.scalar(select(func.max(RequestValue.id))) or 0
+    insert_values(
+        session,
+        (val for val in values if val.request_id in changed_ids),
+        event_ids,
+        first_id=last_id + 1,
+    )
+    return stats
+
+
+def make_db(
+    client: Cosplay2Client,
+    db_path: Path,
+    *,
+    incremental: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
     print("🌐 Начинаем наполнение базы данных...")
-    create_db(db_path=db_path)
+    if incremental and not has_current_schema(db_path=db_path):
+        print("💾 База отсутствует или создана другой версией, собираем её заново")
+        incremental = False
+    if not incremental:
+        create_db(db_path=db_path)
     session = get_session(db_path=db_path)
 
-    with session:
+    with session, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Everything except the values is requested up front (the per-topic
+        # fields as soon as the topic list is in) and fetched in the pool while
+        # the values stream into the DB on this thread. Results are still
+        # written in a fixed order, so the DB content is identical to a
+        # sequential run.
+        requests_future = pool.submit(client.get_all_requests)
+        plan_future = pool.submit(client.get_plan)
+        with profile.stage("Загрузка разделов и заявок"):
+            topics = client.get_list()
+            fields_futures = [
+                pool.submit(client.get_with_fields, topic_url_code=topic.url_code)
+                for topic in topics
+            ]
+            requests = requests_future.result()
+            event_ids = request_event_ids(requests, topics)
+
+        if incremental:
+            # Topics, their fields and the plan are small, so they are simply
+            # replaced; only requests and their values are synced row by row.
+            for model in (PlanNode, TopicField, TopicSection, Topic):
+                session.execute(delete(model))
+
+            print("💾 Синхронизируем заявки...")
+            with profile.stage("Синхронизация заявок"):
+                stats = sync_requests(
+                    session, requests, client.iter_all_values(), event_ids
+                )
+            print(f"💾 Заявки синхронизированы ({stats})")
+        else:
+            # Seed values. The largest payload by far, so it is decoded and
+            # inserted batch by batch instead of being loaded as a whole.
+            print("💾 Сохраняем данные из заявок...")
+            with profile.stage("Загрузка и запись данных заявок"):
+                count = insert_values(session, client.iter_all_values(), event_ids)
+            print(f"💾 Сохранено {count} строк данных из заявок")
+
+            # Seed requests
+            print("💾 Сохраняем заявки...")
+            with profile.stage("Запись заявок"):
+                count = insert_requests(session, requests)
+            print(f"💾 Сохранено {count} заявок")
+
         # Seed topics
         print("💾 Сохраняем разделы...")
-        topics = client.get_list()
-        session.add_all([Topic.from_dto(topic) for topic in topics])
-        print(f"💾 Сохранено {len(topics)} разделов")
-
-        for topic in track(topics, description="💾 Сохраняем поля разделов..."):
-            with_fields = client.get_with_fields(topic_url_code=topic.url_code)
-            session.add_all(
-                [
-                    TopicSection.from_dto(topic_section)
-                    for topic_section in with_fields.topic_sections
-                ]
-            )
-            session.add_all(
-                [
-                    TopicField.from_dto(topic_field)
-                    for topic_field in with_fields.topic_fields
-                ]
-            )
-
-        # Seed requests
-        print("💾 Сохраняем заявки...")
-        requests = client.get_all_requests()
-        session.add_all([Request.from_dto(req) for req in requests])
-        session.flush()
-        print(f"💾 Сохранено {len(requests)} заявок")
-
-        # Seed values
-        print("💾 Сохраняем данные из заявок...")
-        values = client.get_all_values()
-        session.add_all(RequestValue.from_dto(val) for val in values)
-        session.flush()
-        print(f"💾 Сохранено {len(values)} строк данных из заявок")
+        with profile.stage("Запись разделов и полей"):
+            session.add_all([Topic.from_dto(topic) for topic in topics])
+            print(f"💾 Сохранено {len(topics)} разделов")
+
+            for future in track(
+                fields_futures, description="💾 Сохраняем поля разделов..."
+            ):
+                with_fields = future.result()
+                session.add_all(
+                    [
+                        TopicSection.from_dto(topic_section)
+                        for topic_section in with_fields.topic_sections
+                    ]
+                )
+                session.add_all(
+                    [
+                        TopicField.from_dto(topic_field)
+                        for topic_field in with_fields.topic_fields
+                    ]
+                )
 
         # Seed plan
         print("💾 Сохраняем расписание...")
-        plan = client.get_plan()
-
-        def proceed_node(node: PlanNodeDTO, parent_id: str | None = None) -> None:
-            node_orm = PlanNode.from_dto(node)
-            if parent_id:
-                node_orm.parent_id = parent_id
-            session.add(node_orm)
-            session.flush([node_orm])
-            if node.nodes:
-                for child_node in node.nodes:
-                    proceed_node(child_node, node_orm.uid)
-
-        for node in plan:
-            proceed_node(node)
+        with profile.stage("Запись расписания"):
+            insert_plan(session, plan_future.result())
 
         # Commit
-        session.commit()
+        with profile.stage("Фиксация транзакции"):
+            session.commit()
         print(f"💾 Готово! База данных располагается тут: {db_path.absolute()}")
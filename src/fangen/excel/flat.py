@@ -0,0 +1,76 @@
+import csv
+import json
+from typing import TYPE_CHECKING
+
+from rich import print
+
+from fangen.common.data import render_value
+from fangen.common.profiling import profile
+from fangen.db.dataset import stream_summary_data, stream_summary_headers
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from pathlib import Path
+
+    from sqlalchemy.orm import Session
+
+    from fangen.common.data import NodeData
+
+
+def render_rows(
+    rows: Iterable[NodeData], headers: Sequence[str]
+) -> Iterator[list[str]]:
+    for data in rows:
+        yield [render_value(data.get(header)) for header in headers]
+
+
+def write_csv(
+    filepath: Path, headers: Sequence[str], rows: Iterable[Sequence[str]]
+) -> int:
+    # With a BOM, Excel opens the file as UTF-8 rather than in the ANSI code
+    # page; CSV readers of other tools skip it.
+    count = 0
+    with filepath.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for values in rows:
+            writer.writerow(values)
+            count += 1
+    return count
+
+
+def write_jsonl(
+    filepath: Path, headers: Sequence[str], rows: Iterable[Sequence[str]]
+) -> int:
+    count = 0
+    with filepath.open("w", encoding="utf-8") as f:
+        for values in rows:
+            record = dict(zip(headers, values, strict=True))
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+# Writers by the --format of make_data.
+FLAT_WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+def make_flat_data(filepath: Path, session: Session, output_format: str) -> None:
+    """Export the summary sheet of ``make_data`` as CSV or JSON Lines.
+
+    Requests are read from the DB, rendered and written one at a time, so
+    memory does not grow with their number. Empty values are empty strings.
+    """
+    write = FLAT_WRITERS[output_format]
+
+    print("💻 Собираем заголовки...")
+    with profile.stage("Заголовки"):
+        headers = stream_summary_headers(session)
+
+    print("💻 Выгружаем заявки...")
+    with profile.stage("Выгрузка заявок"):
+        count = write(
+            filepath, headers, render_rows(stream_summary_data(session), headers)
+        )
+    print(f"💾 Заявок: {count}. Файл сохранен по пути {filepath.absolute()}")
@@ -1,9 +1,14 @@
 from typing import TYPE_CHECKING
 
-from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
 from openpyxl.utils import get_column_letter
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from openpyxl import Workbook
+    from openpyxl.formatting.formatting import ConditionalFormattingList
     from openpyxl.worksheet.worksheet import Worksheet
 
 # Header styles
@@ -15,49 +20,118 @@ HEADER_ROW_FONT = Font(color="FFFFFF", bold=True)
 # Topic styles
 TOPIC_ROW_FONT = Font(color="000000", bold=True)
 
-# Even style
+# Even style, applied by a single conditional-formatting rule per sheet
 EVEN_ROW_FILL = PatternFill(start_color="e2efda", end_color="e2efda", fill_type="solid")
+ZEBRA_FORMULA = "MOD(ROW(),2)=0"
 
+# Center the header for emphasis; left-align body cells because long, wrapped
+# Russian text is easier to read flush-left than centered. Keep everything
+# vertically centered within the row.
+HEADER_ALIGNMENT = Alignment(wrapText=True, horizontal="center", vertical="center")
+BODY_ALIGNMENT = Alignment(wrapText=True, horizontal="left", vertical="center")
 
-def apply_final_formatting(
-    ws: Worksheet,
+
+# Named styles: a cell refers to one by name instead of carrying its own
+# font, fill and alignment.
+HEADER_STYLE = "fangen: заголовок"
+BODY_STYLE = "fangen: данные"
+TOPIC_STYLE = "fangen: раздел"
+
+
+def register_styles(wb: Workbook) -> None:
+    """Add the named styles to ``wb``, unless a previous run already did."""
+    styles = (
+        NamedStyle(
+            HEADER_STYLE,
+            font=HEADER_ROW_FONT,
+            fill=HEADER_ROW_FILL,
+            alignment=HEADER_ALIGNMENT,
+        ),
+        NamedStyle(BODY_STYLE, alignment=BODY_ALIGNMENT),
+        NamedStyle(TOPIC_STYLE, font=TOPIC_ROW_FONT, alignment=BODY_ALIGNMENT),
+    )
+    for style in styles:
+        if style.name not in wb.named_styles:
+            wb.add_named_style(style)
+
+
+def fit_width(
+    max_length: int,
     max_cell_length: int = 60,
     padding: int = 2,
     min_cell_length: int = 8,
+) -> int:
+    """Column width for values of up to ``max_length`` characters.
+
+    Clamped between a minimum (so short columns stay comfortably readable and
+    their header/filter arrow are not cramped) and a maximum (so long
+    free-text values wrap instead of stretching the column off-screen).
+    """
+    return max(min_cell_length, min(max_length + padding, max_cell_length))
+
+
+class ColumnWidths:
+    """Longest value of every column, tracked as the rows are written."""
+
+    def __init__(self, headers: Sequence[object]) -> None:
+        self.lengths = [len(str(header)) if header else 0 for header in headers]
+
+    def add(self, values: Sequence[str | None]) -> None:
+        self.lengths = [
+            max(length, len(value)) if value else length
+            for length, value in zip(self.lengths, values, strict=False)
+        ]
+
+    def fitted(self, max_cell_length: int = 60) -> list[int]:
+        return [fit_width(length, max_cell_length) for length in self.lengths]
+
+
+def add_zebra_stripes(formatting: ConditionalFormattingList, ref: str) -> None:
+    """Fill every even row of ``ref``, replacing stripes of a previous run.
+
+    Takes the ``conditional_formatting`` of a sheet: write-only sheets get it
+    from ``Worksheet._setup``, but do not declare it.
+    """
+    for cf in list(formatting):
+        rules = formatting[str(cf.sqref)]
+        rules[:] = [rule for rule in rules if rule.formula != [ZEBRA_FORMULA]]
+        if not rules:
+            del formatting[str(cf.sqref)]
+    formatting.add(ref, FormulaRule(formula=[ZEBRA_FORMULA], fill=EVEN_ROW_FILL))
+
+
+def clear_static_stripes(ws: Worksheet) -> None:
+    """Remove the even-row fill that older versions set on every data cell.
+
+    Left in place, it would show under the conditional stripes and fall out
+    of step with them once ``--update`` inserts or deletes rows.
+    """
+    no_fill = PatternFill()
+    for row in ws.iter_rows(min_row=2):
+        for cell in row:
+            if cell.fill == EVEN_ROW_FILL:
+                cell.fill = no_fill
+
+
+def apply_final_formatting(
+    ws: Worksheet,
+    widths: Sequence[int],
     freeze_cell: str = "A2",  # Header
     *,
     auto_filter: bool = True,
 ) -> None:
-    header_row = ws[1]
-    for cell in header_row:
-        cell.fill = HEADER_ROW_FILL
-        cell.font = HEADER_ROW_FONT
-    for col_idx, col_cells in enumerate(ws.columns, start=1):
-        max_length = 0
-        for cell in col_cells:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        column_letter = get_column_letter(col_idx)
-        # Clamp the fitted width between a minimum (so short columns stay
-        # comfortably readable and their header/filter arrow are not cramped)
-        # and a maximum (so long free-text values wrap instead of stretching
-        # the column off-screen).
-        final_length = max_length + padding
-        final_length = max(min_cell_length, min(final_length, max_cell_length))
-        ws.column_dimensions[column_letter].width = final_length
-    for row in ws.iter_rows():
-        # Auto-height (updates height on Excel launch)
-        ws.row_dimensions[row[0].row].height = None
-        is_header = row[0].row == 1
-        for cell in row:
-            # Center the header for emphasis; left-align body cells because
-            # long, wrapped Russian text is easier to read flush-left than
-            # centered. Keep everything vertically centered within the row.
-            cell.alignment = Alignment(
-                wrapText=True,
-                horizontal="center" if is_header else "left",
-                vertical="center",
-            )
+    """Finish a sheet whose cells got their named styles as they were written."""
+    for col_idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    # Auto-height (updates height on Excel launch)
+    for dimension in ws.row_dimensions.values():
+        dimension.height = None
+    if ws.max_row > 1:
+        clear_static_stripes(ws)
+        add_zebra_stripes(
+            ws.conditional_formatting,
+            f"A2:{get_column_letter(ws.max_column)}{ws.max_row}",
+        )
     # Add filter dropdowns on the header row so users can sort and filter
     # columns directly. Skipped for sheets whose rows are not a flat table
     # (e.g. the plan, where topic rows act as section separators).
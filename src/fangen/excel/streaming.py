@@ -0,0 +1,60 @@
+from typing import TYPE_CHECKING
+
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from fangen.excel.formatting import BODY_STYLE, HEADER_STYLE, add_zebra_stripes
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from openpyxl import Workbook
+
+
+class StreamingSheet:
+    """A sheet of a write-only workbook, styled as its rows are written.
+
+    Each row goes straight to the file instead of into a cell per value, so
+    the sheet itself holds no rows. Column widths and the frozen cell are
+    written before the first row, though, so the widths must be known up
+    front: the caller passes over its rows once for them. Cells refer to the
+    named styles of ``register_styles``, which must already be in ``wb``.
+    """
+
+    def __init__(
+        self,
+        wb: Workbook,
+        title: str,
+        headers: Sequence[str],
+        widths: Sequence[int],
+        *,
+        freeze_cell: str = "A2",  # Header
+    ) -> None:
+        self.ws = wb.create_sheet(title=title)
+        for col_idx, width in enumerate(widths, start=1):
+            self.ws.column_dimensions[get_column_letter(col_idx)].width = width
+        self.ws.freeze_panes = freeze_cell
+        self.columns = len(headers)
+        self.rows = 0
+        self._append(headers, HEADER_STYLE)
+
+    def _append(self, values: Sequence[str], style: str) -> None:
+        row = []
+        for value in values:
+            cell = WriteOnlyCell(self.ws, value)
+            cell.style = style
+            row.append(cell)
+        self.ws.append(row)
+        self.rows += 1
+
+    def append(self, values: Sequence[str]) -> None:
+        self._append(values, BODY_STYLE)
+
+    def close(self) -> None:
+        """Add zebra stripes and filter dropdowns over everything written."""
+        last_column = get_column_letter(max(self.columns, 1))
+        if self.rows > 1:
+            add_zebra_stripes(
+                self.ws.conditional_formatting, f"A2:{last_column}{self.rows}"
+            )
+        self.ws.auto_filter.ref = f"A1:{last_column}{self.rows}"
@@ -1,114 +1,214 @@
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+from operator import itemgetter
 from typing import TYPE_CHECKING
 
 from openpyxl import Workbook
 from rich import print
 
-from fangen.common.data import parse_request
-from fangen.common.utils import MULTI_VALUE_SEPARATOR
-from fangen.cosplay2.models.vo import PlanNodeType
-from fangen.db.repo import get_plan_nodes, get_topics_with_approved_requests
-from fangen.excel.formatting import EVEN_ROW_FILL, apply_final_formatting
+from fangen.common.data import render_value
+from fangen.common.profiling import profile
+from fangen.db.dataset import (
+    load_topics,
+    stream_summary_data,
+    stream_summary_headers,
+    stream_topic_data,
+)
+from fangen.db.factory import get_session
+from fangen.excel.formatting import ColumnWidths, register_styles
+from fangen.excel.streaming import StreamingSheet
 from fangen.excel.utils import check_excel_file
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Iterator, Sequence
     from pathlib import Path
 
     from sqlalchemy.orm import Session
 
+    from fangen.common.data import NodeData
     from fangen.config import Config
-    from fangen.db.models import Request
+    from fangen.db.dataset import TopicRow
 
 # Placeholder for empty cells in the Excel export. A visible dash reads better
 # for humans than a blank cell.
 EXCEL_EMPTY = "—"
 
+# Characters Windows does not allow in file names, for --split workbooks.
+ILLEGAL_FILENAME_CHARS = r'[<>:"/\\|?*\x00-\x1F]'
 
-def render_value(value: object, empty: str = "") -> str:
-    """Render a parsed request value as a single cell string.
 
-    Multiple values are joined with MULTI_VALUE_SEPARATOR; missing or empty
-    values become ``empty`` (a visible dash in Excel).
+def excel_row(data: NodeData, headers: Sequence[str]) -> list[str]:
+    return [render_value(data.get(header), empty=EXCEL_EMPTY) for header in headers]
+
+
+def sheet_widths(
+    headers: Sequence[str], rows: Iterable[Sequence[str]], config: Config
+) -> list[int]:
+    """Column widths of a sheet, from a pass over its rows that keeps none."""
+    widths = ColumnWidths(headers)
+    for values in rows:
+        widths.add(values)
+    return widths.fitted(config.max_cell_length)
+
+
+def write_sheet(
+    wb: Workbook,
+    title: str,
+    headers: Sequence[str],
+    widths: Sequence[int],
+    rows: Iterable[Sequence[str]],
+    *,
+    freeze_cell: str = "A2",
+) -> None:
+    """Stream ``rows`` into a new sheet with the given column widths."""
+    sheet = StreamingSheet(wb, title, headers, widths, freeze_cell=freeze_cell)
+    for values in rows:
+        sheet.append(values)
+    sheet.close()
+
+
+def write_summary_sheet(
+    wb: Workbook, session: Session, topics: dict[int, TopicRow], config: Config
+) -> None:
+    headers = stream_summary_headers(session)
+
+    def rows() -> Iterator[list[str]]:
+        for data in stream_summary_data(session, topics):
+            yield excel_row(data, headers)
+
+    widths = sheet_widths(headers, rows(), config)
+    write_sheet(wb, "Сводный", headers, widths, rows(), freeze_cell="B2")
+
+
+def sheet_title(topic: TopicRow) -> str:
+    return re.sub(r"[\/\\\?\*\:\[\]]", " ", topic.title)[:30]
+
+
+def write_topic_sheets(
+    wb: Workbook,
+    session: Session,
+    topics: dict[int, TopicRow],
+    config: Config,
+    topic_id: int | None = None,
+) -> None:
+    """One sheet per topic, or only the sheet of ``topic_id``.
+
+    The requests of all topics come in one stream, in sheet order. It is read
+    twice: once for the widths of every sheet, then for their rows.
     """
-    if isinstance(value, list):
-        parts = [str(item) for item in value if item is not None and str(item) != ""]
-        return MULTI_VALUE_SEPARATOR.join(parts) if parts else empty
-    if value is None or value == "":
-        return empty
-    return str(value)
+    sheets = [topics[topic_id]] if topic_id is not None else list(topics.values())
+
+    def rows() -> Iterator[tuple[int, list[str]]]:
+        for request_topic, data in stream_topic_data(session, topics, topic_id):
+            yield request_topic, excel_row(data, topics[request_topic].fields)
 
+    widths = {topic.id: ColumnWidths(topic.fields) for topic in sheets}
+    for request_topic, values in rows():
+        widths[request_topic].add(values)
 
-def collect_summary(
+    groups = groupby(rows(), key=itemgetter(0))
+    group_topic, group = next(groups, (None, iter(())))
+    for topic in sheets:
+        print(f"""📄 Заполняем лист раздела '{topic.title}'...""")
+        # Topics without approved requests get a sheet of headers only.
+        has_rows = topic.id == group_topic
+        write_sheet(
+            wb,
+            sheet_title(topic),
+            topic.fields,
+            widths[topic.id].fitted(config.max_cell_length),
+            (values for _, values in group) if has_rows else (),
+        )
+        if has_rows:
+            group_topic, group = next(groups, (None, iter(())))
+
+
+def topic_workbook_path(directory: Path, index: int, topic: TopicRow) -> Path:
+    """File of a topic in ``--split`` mode, numbered in the sheet order."""
+    title = re.sub(ILLEGAL_FILENAME_CHARS, " ", topic.title).strip()
+    return directory / f"{index:02} {title}.xlsx"
+
+
+def write_topic_workbook(topic_id: int, filepath: Path, config: Config) -> Path:
+    """Write the sheet of one topic to a workbook of its own.
+
+    Runs in a worker process, so it opens its own read-only session and reads
+    only the requests of the topic.
+    """
+    wb = Workbook(write_only=True)
+    register_styles(wb)
+    with get_session(db_path=config.db_path, read_only=True) as session:
+        topics = load_topics(session)
+        write_topic_sheets(wb, session, topics, config, topic_id)
+    wb.save(filepath)
+    return filepath
+
+
+def write_topic_workbooks(
+    directory: Path, topics: dict[int, TopicRow], config: Config, workers: int | None
+) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {
+        topic.id: topic_workbook_path(directory, index, topic)
+        for index, topic in enumerate(topics.values(), start=1)
+    }
+    for path in paths.values():
+        if path.exists():
+            check_excel_file(path)
+    # Workbooks are independent, so each is built in a process of its own
+    # (openpyxl is pure Python and would hold the GIL in threads). Stages of
+    # the workers are not part of --profile.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_topic_workbook, topic_id, path, config)
+            for topic_id, path in paths.items()
+        ]
+        for future in as_completed(futures):
+            print(f"📄 Сохранён файл раздела {future.result().name}")
+
+
+def make_data(
+    filepath: Path,
     session: Session,
-) -> tuple[list[str], Sequence[Request]]:
-    """Return the flat summary layout: the union of all field titles across
-    approved requests (prefixed with the ``info`` label column) and the
-    requests themselves.
+    config: Config,
+    *,
+    split: bool = False,
+    workers: int | None = None,
+) -> None:
+    """Export approved requests to ``filepath``.
+
+    With ``split``, ``filepath`` gets only the summary sheet and every topic
+    is written to a workbook of its own in a directory named after the file.
     """
-    plan_nodes = get_plan_nodes(session)
-    requests = [
-        node.request
-        for node in plan_nodes
-        if node.type is PlanNodeType.REQUEST and node.request is not None
-    ]
-    headers = ["info"]
-    seen = {"info"}
-    for request in requests:
-        for value in request.values:
-            if value.title not in seen:
-                seen.add(value.title)
-                headers.append(value.title)
-    return headers, requests
-
-
-def make_data(filepath: Path, session: Session, config: Config) -> None:
     if filepath.exists():
         check_excel_file(filepath)
-    wb = Workbook()
+    # Sheets hold no cells, and requests are read from the DB one at a time:
+    # each sheet streams its requests twice, once for the column widths and
+    # once for the rows, so memory does not grow with their number.
+    wb = Workbook(write_only=True)
+    register_styles(wb)
+
+    print("💻 Загружаем разделы...")
+    with profile.stage("Загрузка разделов"):
+        topics = load_topics(session)
 
     # Summary sheet with combined data
     print("💻 Заполняем сводный лист...")
-    ws = wb.active
-    ws.title = "Сводный"
-    ws.freeze_panes = "B1"
-    headers, requests = collect_summary(session)
-    ws.append(headers)
-    current_row_index = 2
-    for request in requests:
-        current_row = ws[current_row_index]
-        data = parse_request(request)
-        for cell, header in zip(current_row, headers, strict=False):
-            if isinstance(header, str):
-                cell.value = render_value(data.get(header), empty=EXCEL_EMPTY)
-            if current_row_index % 2 == 0:
-                cell.fill = EVEN_ROW_FILL
-        current_row_index += 1
-    print("🧹 Наводим красоту...")
-    apply_final_formatting(ws, max_cell_length=config.max_cell_length, freeze_cell="B2")
-
-    # One sheet per topic
-    print("💻 Заполняем листы разделов...")
-    topics = get_topics_with_approved_requests(session)
-    for topic in topics:
-        print(f"""📄 Заполняем лист раздела '{topic.title}'...""")
-        title = re.sub(r"[\/\\\?\*\:\[\]]", " ", topic.title)[:30]
-        ws = wb.create_sheet(title=title)
-
-        headers = [field.title for field in topic.fields]
-        ws.append(headers)
-
-        for request in topic.requests:
-            current_row_index = topic.requests.index(request) + 2
-            data = parse_request(request)
-            current_row = ws[current_row_index]
-            for cell, header in zip(current_row, headers, strict=False):
-                cell.value = render_value(data.get(header), empty=EXCEL_EMPTY)
-                if current_row_index % 2 == 0:
-                    cell.fill = EVEN_ROW_FILL
-    print("🧹 Наводим красоту...")
-    for ws in wb.worksheets[1:]:
-        apply_final_formatting(ws, max_cell_length=config.max_cell_length)
-
-    wb.save(filepath)
+    with profile.stage("Сводный лист"):
+        write_summary_sheet(wb, session, topics, config)
+
+    if split:
+        directory = filepath.with_suffix("")
+        print(f"💻 Заполняем файлы разделов в {directory.absolute()}...")
+        with profile.stage("Файлы разделов"):
+            write_topic_workbooks(directory, topics, config, workers)
+    else:
+        # One sheet per topic
+        print("💻 Заполняем листы разделов...")
+        with profile.stage("Листы разделов"):
+            write_topic_sheets(wb, session, topics, config)
+
+    with profile.stage("Сохранение файла"):
+        wb.save(filepath)
     print(f"💾 Файл сохранен по пути {filepath.absolute()}")
@@ -1,31 +1,287 @@
+from dataclasses import dataclass
+from difflib import SequenceMatcher
 from typing import TYPE_CHECKING
 
 from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
 from rich import print
 from rich.progress import track
 
-from fangen.common.data import get_node_data
-from fangen.common.utils import format_template
+from fangen.common.data import NodeData
+from fangen.common.profiling import profile
+from fangen.common.utils import compile_template
 from fangen.cosplay2.models.vo import PlanNodeType
-from fangen.db.repo import get_plan_nodes
+from fangen.db.dataset import PlanRow, load_dataset
 from fangen.excel.formatting import (
-    EVEN_ROW_FILL,
-    TOPIC_ROW_FONT,
+    BODY_STYLE,
+    HEADER_STYLE,
+    TOPIC_STYLE,
+    ColumnWidths,
     apply_final_formatting,
+    register_styles,
 )
 from fangen.excel.utils import check_excel_file
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from pathlib import Path
 
+    from openpyxl.worksheet.worksheet import Worksheet
     from sqlalchemy.orm import Session
 
+    from fangen.db.dataset import Dataset
+
 ALLOWED_PLAN_NODE_TYPES = [PlanNodeType.EVENT, PlanNodeType.TOPIC, PlanNodeType.REQUEST]
 
+# Header of the column that ties the rows of a refreshed sheet to plan nodes.
+# Added (and hidden) when a sheet has none, so any column can be a template.
+KEY_HEADER = "{uid}"
+
+
+@dataclass(slots=True)
+class RefreshStats:
+    changed_cells: int = 0
+    inserted_rows: int = 0
+    deleted_rows: int = 0
+
+
+def key_column(sheet: Worksheet, headers: list[object]) -> int:
+    """Index of the ``KEY_HEADER`` column, adding a hidden one if missing."""
+    if KEY_HEADER in headers:
+        return headers.index(KEY_HEADER)
+    column = sheet.max_column + 1
+    sheet.cell(row=1, column=column, value=KEY_HEADER)
+    sheet.column_dimensions[get_column_letter(column)].hidden = True
+    return column - 1
+
+
+def seed_keys(
+    sheet: Worksheet,
+    key: int,
+    headers: Sequence[object],
+    rows: Sequence[Sequence[str | None]],
+) -> int:
+    """Fill a just added key column of rows written without one.
+
+    Rows are matched to ``rows`` by their template cells, so each node whose
+    rendering did not change gets its key back; rows in between, of nodes
+    that did change, are paired in order. Returns how many rows got a key.
+    """
+    columns = [
+        column
+        for column, header in enumerate(headers)
+        if isinstance(header, str) and column != key
+    ]
+    existing = [
+        tuple(
+            str(sheet.cell(row=row, column=column + 1).value or "")
+            for column in columns
+        )
+        for row in range(2, sheet.max_row + 1)
+    ]
+    wanted = [tuple(values[column] or "" for column in columns) for values in rows]
+    matcher = SequenceMatcher(None, existing, wanted, autojunk=False)
+    seeded = 0
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag not in {"equal", "replace"}:
+            continue
+        # A replaced block may be longer on either side. Its extra nodes get
+        # inserted by refresh_rows; its extra rows are left without a key and
+        # kept, as they may have been added by hand.
+        for old, new in zip(
+            range(old_start, old_end), range(new_start, new_end), strict=False
+        ):
+            sheet.cell(row=old + 2, column=key + 1, value=rows[new][key])
+            seeded += 1
+    return seeded
+
+
+def write_row(
+    sheet: Worksheet, row: int, values: Sequence[str | None], style: str
+) -> None:
+    for column, value in enumerate(values, start=1):
+        cell = sheet.cell(row=row, column=column)
+        if value is not None:
+            cell.value = value
+        cell.style = style
+
+
+def update_row(sheet: Worksheet, row: int, values: Sequence[str | None]) -> int:
+    """Write the values that differ from the cells; returns how many did."""
+    changed = 0
+    for column, value in enumerate(values, start=1):
+        if value is None:
+            continue
+        cell = sheet.cell(row=row, column=column)
+        # Empty strings are read back from the file as empty cells.
+        if (cell.value or "") != value:
+            cell.value = value
+            changed += 1
+    return changed
+
+
+def row_runs(rows: Sequence[int]) -> list[tuple[int, int]]:
+    """Split ascending row numbers into ``(first row, count)`` contiguous runs."""
+    runs: list[tuple[int, int]] = []
+    for row in rows:
+        if runs and runs[-1][0] + runs[-1][1] == row:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((row, 1))
+    return runs
+
+
+def refresh_rows(
+    sheet: Worksheet,
+    key: int,
+    rows: Sequence[Sequence[str | None]],
+    styles: Sequence[str],
+) -> RefreshStats:
+    """Bring the rows of ``sheet`` in line with ``rows``, matched by ``key``.
+
+    Rows whose node is still in the plan keep their place, styles and
+    non-template cells, and only cells whose value changed are written.
+    Rows are inserted and deleted only where nodes were added or removed.
+    Rows without a key were added by hand and are left as they are.
+    """
+    keyed = [
+        (row, value)
+        for row in range(2, sheet.max_row + 1)
+        if (value := sheet.cell(row=row, column=key + 1).value) is not None
+    ]
+    positions = [row for row, _ in keyed]
+    existing = [value for _, value in keyed]
+    wanted = [values[key] for values in rows]
+    matcher = SequenceMatcher(None, existing, wanted, autojunk=False)
+    stats = RefreshStats()
+    # Bottom-up, so that inserting or deleting rows never shifts the rows an
+    # earlier (higher) opcode still refers to.
+    for tag, old_start, old_end, new_start, new_end in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            for old, new in zip(
+                range(old_start, old_end), range(new_start, new_end), strict=True
+            ):
+                stats.changed_cells += update_row(sheet, positions[old], rows[new])
+            continue
+        # Keyless rows between the removed ones stay, so each run of
+        # adjacent rows is deleted separately.
+        for first, count in reversed(row_runs(positions[old_start:old_end])):
+            sheet.delete_rows(first, count)
+        stats.deleted_rows += old_end - old_start
+        if new_end > new_start:
+            # New rows go right before the next remaining keyed row, or after
+            # the last one (or at the end, if there is none).
+            if old_start < len(positions):
+                insert_at = positions[old_start]
+            elif positions:
+                insert_at = positions[-1] + 1
+            else:
+                insert_at = sheet.max_row + 1
+            sheet.insert_rows(insert_at, new_end - new_start)
+            stats.inserted_rows += new_end - new_start
+            for offset, new in enumerate(range(new_start, new_end)):
+                write_row(sheet, insert_at + offset, rows[new], styles[new])
+    return stats
+
+
+def update_rows(
+    sheet: Worksheet,
+    key: int,
+    headers: Sequence[object],
+    rows: Sequence[Sequence[str | None]],
+    styles: Sequence[str],
+    *,
+    seed: bool,
+) -> RefreshStats:
+    """``refresh_rows``, after ``seed_keys`` if the key column was just added."""
+    if seed and sheet.max_row > 1:
+        # The rows were written without keys, e.g. by a run without --update.
+        # Keys are matched to them first, or every row would be replaced and
+        # lose its manual edits.
+        seeded = seed_keys(sheet, key, headers, rows)
+        print(
+            f"🔑 Ключи {KEY_HEADER} подобраны для {seeded} из {sheet.max_row - 1} строк"
+        )
+    return refresh_rows(sheet, key, rows, styles)
 
-def make_plan(filepath: Path, session: Session) -> None:
+
+@dataclass(frozen=True, slots=True)
+class PlanRows:
+    """The rows every plan sheet is rendered from, computed once per run."""
+
+    nodes: list[PlanRow]
+    # Template data of each node, with the request numbering ({n}) applied.
+    data: list[NodeData]
+    styles: list[str]
+
+    def render(self, headers: Sequence[object]) -> list[list[str | None]]:
+        """Cell values of every row under ``headers``, ``None`` for non-templates."""
+        # Each header is compiled once (and cached across sheets and files)
+        # and rendered for all rows in one go.
+        columns = [
+            compile_template(header).render_many(self.data)
+            if isinstance(header, str)
+            else None
+            for header in headers
+        ]
+        return [
+            [column[offset] if column is not None else None for column in columns]
+            for offset in range(len(self.nodes))
+        ]
+
+
+def plan_rows(dataset: Dataset) -> PlanRows:
+    nodes = [node for node in dataset.plan if node.type in ALLOWED_PLAN_NODE_TYPES]
+    rows_data = []
+    request_number = 1
+    for node in nodes:
+        data = dataset.node_data(node)
+        if node.type == PlanNodeType.REQUEST:
+            data.update({"n": f"{request_number:03}"})
+            request_number += 1
+        rows_data.append(data)
+    styles = [
+        TOPIC_STYLE if node.type is PlanNodeType.TOPIC else BODY_STYLE for node in nodes
+    ]
+    return PlanRows(nodes, rows_data, styles)
+
+
+def fill_sheet(sheet: Worksheet, plan: PlanRows, *, update: bool) -> None:
+    headers = [cell.value for cell in sheet[1]]
+    key = None
+    new_key = update and KEY_HEADER not in headers
+    if update:
+        key = key_column(sheet, headers)
+        headers = [cell.value for cell in sheet[1]]
+    print(f"🎩 Заголовки: {headers}")
+    for cell in sheet[1]:
+        cell.style = HEADER_STYLE
+
+    rows = plan.render(headers)
+    if key is not None:
+        stats = update_rows(sheet, key, headers, rows, plan.styles, seed=new_key)
+        print(
+            f"✏️ Изменено ячеек: {stats.changed_cells}, "
+            f"добавлено строк: {stats.inserted_rows}, "
+            f"удалено строк: {stats.deleted_rows}"
+        )
+    else:
+        sheet.delete_rows(2, sheet.max_row - 1)
+        for offset, values in enumerate(track(rows, "✏️ Заполняем строки...")):
+            write_row(sheet, offset + 2, values, plan.styles[offset])
+
+    widths = ColumnWidths(headers)
+    for values in rows:
+        widths.add(values)
+
+    # The plan mixes event/topic/request rows, so its topic rows act as
+    # section separators rather than a flat table; filtering would hide
+    # them, so no auto-filter here.
+    apply_final_formatting(sheet, widths.fitted(), auto_filter=False)
+
+
+def open_plan(filepath: Path) -> Workbook:
     if filepath.exists():
-        check_excel_file(filepath)
         wb = load_workbook(filepath)
         print(f"💻 Открыт ранее созданный файл {filepath}")
     else:
@@ -35,45 +291,36 @@ def make_plan(filepath: Path, session: Session) -> None:
         ws.title = "Лист1"
         basic_headers = ["{info}"]
         ws.append(basic_headers)
+    register_styles(wb)
+    return wb
 
-    print("💻 Загружаем расписание и данные...")
-    plan_nodes = get_plan_nodes(session)
 
-    for sheet in wb.worksheets:
-        print(f"""📄 Обрабатываем лист '{sheet.title}'...""")
-        first_row = sheet[1]
-        headers = [cell.value for cell in first_row]
-        print(f"🎩 Заголовки: {headers}")
+def make_plan(
+    filepaths: Sequence[Path], session: Session, *, update: bool = False
+) -> None:
+    """Fill the sheets of every file in ``filepaths`` from the header templates.
 
-        sheet.delete_rows(2, sheet.max_row - 1)
+    The plan is loaded and its rows computed once for all the files. By
+    default every sheet is rewritten. With ``update``, rows are matched to
+    plan nodes by their ``uid`` (kept in a ``KEY_HEADER`` column) and only
+    what changed is written, so manual edits of other rows survive.
+    """
+    # Fail before the DB is loaded if any of the files is open in Excel.
+    for filepath in filepaths:
+        if filepath.exists():
+            check_excel_file(filepath)
+
+    print("💻 Загружаем расписание и данные...")
+    with profile.stage("Загрузка данных"):
+        plan = plan_rows(load_dataset(session))
+
+    for filepath in filepaths:
+        wb = open_plan(filepath)
+        for sheet in wb.worksheets:
+            print(f"""📄 Обрабатываем лист '{sheet.title}'...""")
+            with profile.stage("Заполнение листов"):
+                fill_sheet(sheet, plan, update=update)
 
-        current_row_index = 2
-        request_number = 1
-        nodes = [node for node in plan_nodes if node.type in ALLOWED_PLAN_NODE_TYPES]
-        for node in track(nodes, "✏️ Заполняем строки..."):
-            current_row = sheet[current_row_index]
-            data = get_node_data(node)
-
-            if node.type == PlanNodeType.REQUEST:
-                data.update({"n": f"{request_number:03}"})
-                request_number += 1
-
-            for cell, header in zip(current_row, headers, strict=False):
-                if isinstance(header, str):
-                    cell.value = format_template(header, data)
-                if node.type is PlanNodeType.TOPIC:
-                    cell.font = TOPIC_ROW_FONT
-                if current_row_index % 2 == 0:
-                    cell.fill = EVEN_ROW_FILL
-
-            current_row_index += 1
-
-    print("🧹 Наводим красоту...")
-    for sheet in wb.worksheets:
-        # The plan mixes event/topic/request rows, so its topic rows act as
-        # section separators rather than a flat table; filtering would hide
-        # them, so no auto-filter here.
-        apply_final_formatting(sheet, auto_filter=False)
-
-    wb.save(filepath)
-    print(f"💾 Файл сохранен по пути {filepath.absolute()}")
+        with profile.stage("Сохранение файла"):
+            wb.save(filepath)
+        print(f"💾 Файл сохранен по пути {filepath.absolute()}")
@@ -1,5 +1,4 @@
 import enum
-import json
 import os
 from dataclasses import dataclass
 from datetime import datetime
@@ -10,17 +9,15 @@ import yt_dlp
 from rich import print
 from yt_dlp import DownloadError
 
-from fangen.common.utils import build_cosplay2_file_link, build_cosplay2_image_link
-from fangen.common.values import parse_file_value, parse_image_value
-from fangen.cosplay2.models.vo import ValueType
-from fangen.db.repo import get_approved_requests
-from fangen.files.utils import build_file_index, iter_file_values, write_log
+from fangen.common.profiling import profile
+from fangen.db.repo import get_approved_files
+from fangen.files.utils import build_file_index, iter_wanted_files, write_log
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
     from fangen.config import Config
-    from fangen.db.models import Request, RequestValue
+    from fangen.db.models import RequestFile
 
 
 class DownloadStatus(enum.StrEnum):
@@ -44,22 +41,6 @@ class DownloadResult:
         )
 
 
-def parse_download_link(value: RequestValue, request: Request) -> str | None:
-    if value.type == ValueType.IMAGE:
-        filename = parse_image_value(value).filename
-        return build_cosplay2_image_link(request.topic.event_id, request.id, filename)
-    if value.type == ValueType.FILE:
-        file_value = parse_file_value(value)
-        return (
-            build_cosplay2_file_link(
-                request.topic.event_id, request.id, file_value.filename
-            )
-            if file_value.filename
-            else file_value.link
-        )
-    return None
-
-
 def _is_up_to_date(file: Path, update_time: str) -> bool:
     """Whether ``file`` is newer than the request's last update.
 
@@ -82,8 +63,7 @@ def _remove_files_by_id(directory: Path, value_id: int) -> None:
 
 
 def download_value_file(
-    value: RequestValue,
-    request: Request,
+    file: RequestFile,
     output_dir: Path,
     config: Config,
     existing_files: dict[int, Path],
@@ -94,29 +74,24 @@ def download_value_file(
         return DownloadResult(
             status=status,
             filename=filename,
-            request_title=request.voting_title,
-            value_title=value.title,
+            request_title=file.request.voting_title,
+            value_title=file.title,
             link=link,
         )
 
-    internal_filename = f"{value.id}.*"
+    internal_filename = f"{file.value_id}.*"
 
-    if value.value is None:
-        return result(DownloadStatus.FAIL, internal_filename)
-
-    try:
-        link = parse_download_link(value, request)
-    except KeyError, ValueError, json.JSONDecodeError:
-        return result(DownloadStatus.FAIL, internal_filename)
+    # No URL means nothing was attached or the value could not be parsed.
+    link = file.url
     if not link:
         return result(DownloadStatus.FAIL, internal_filename)
 
-    existing_file = existing_files.get(value.id)
-    if existing_file and _is_up_to_date(existing_file, request.update_time):
+    existing_file = existing_files.get(file.value_id)
+    if existing_file and _is_up_to_date(existing_file, file.request.update_time):
         return result(DownloadStatus.OK, existing_file.name, link)
 
     # yt-dlp names the file after the value id so lookups stay deterministic.
-    ydl_config = {"outtmpl": f"{output_dir}/{value.id}.%(ext)s", "quiet": True}
+    ydl_config = {"outtmpl": f"{output_dir}/{file.value_id}.%(ext)s", "quiet": True}
     with yt_dlp.YoutubeDL(ydl_config) as ydl:
         try:
             info = ydl.extract_info(link, download=False)
@@ -124,7 +99,7 @@ def download_value_file(
         except DownloadError, TypeError:
             return result(DownloadStatus.FAIL, internal_filename, link)
 
-        internal_filename = f"{value.id}{ext}"
+        internal_filename = f"{file.value_id}{ext}"
 
         if ext.lstrip(".") not in config.allowed_exts:
             return result(DownloadStatus.SKIP, internal_filename, link)
@@ -134,7 +109,7 @@ def download_value_file(
 
         # Drop any stale file for this id (e.g. a different extension) so
         # yt-dlp does not skip the download believing it already exists.
-        _remove_files_by_id(output_dir, value.id)
+        _remove_files_by_id(output_dir, file.value_id)
         try:
             dl_info = ydl.extract_info(link, download=True)
         except DownloadError, OSError:
@@ -152,19 +127,18 @@ def download_value_file(
 
 
 def download_files(output_dir: Path, session: Session, config: Config) -> None:
-    print("💻 Загружаем заявки...")
-    requests = get_approved_requests(session)
+    print("💻 Загружаем файлы заявок...")
+    with profile.stage("Загрузка данных"):
+        files = get_approved_files(session)
     print("💾 Начинаем проверку и скачивание файлов...")
     existing_files = build_file_index(output_dir)
     results: list[DownloadResult] = []
 
-    for request in requests:
-        for value in iter_file_values(request, config):
-            result = download_value_file(
-                value, request, output_dir, config, existing_files
-            )
-            print(str(result))
-            results.append(result)
+    for file in iter_wanted_files(files, config):
+        with profile.stage("Скачивание файла"):
+            result = download_value_file(file, output_dir, config, existing_files)
+        print(str(result))
+        results.append(result)
 
     write_log(
         output_dir / "log.txt",
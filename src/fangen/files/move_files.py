@@ -2,24 +2,27 @@ import enum
 import re
 import shutil
 from dataclasses import dataclass
+from itertools import groupby
+from operator import attrgetter
 from typing import TYPE_CHECKING
 
 from rich import print
 from rich.progress import track
 
-from fangen.common.data import parse_request
-from fangen.common.utils import format_template
-from fangen.cosplay2.models.vo import PlanNodeType
-from fangen.db.repo import get_approved_requests, get_plan_nodes
-from fangen.files.utils import build_file_index, iter_file_values, write_log
+from fangen.common.profiling import profile
+from fangen.common.utils import compile_template
+from fangen.db.dataset import load_dataset
+from fangen.db.repo import get_files
+from fangen.files.utils import build_file_index, iter_wanted_files, write_log
 
 if TYPE_CHECKING:
     from pathlib import Path
 
     from sqlalchemy.orm import Session
 
+    from fangen.common.utils import CompiledTemplate
     from fangen.config import Config
-    from fangen.db.models import RequestValue
+    from fangen.db.models import RequestFile
 
 ILLEGAL_CHARS = r'[<>:"/\\|?*\x00-\x1F]'
 REPLACEMENT_CHAR = "_"
@@ -82,28 +85,27 @@ def resolve_destination(raw_path: str, output_dir: Path) -> Path:
 
 
 def move_value_file(
-    value: RequestValue,
+    file: RequestFile,
     request_data: dict,
     extra_data: dict,
     src: Path | None,
     *,
     output_dir: Path,
     config: Config,
+    filename_template: CompiledTemplate,
 ) -> MoveResult:
     request_title = request_data.get("info")
 
     if not src:
         # File not found but it was actually required
         return MoveResult(
-            MoveStatus.NOT_FOUND, f"{value.id}.*", request_title, value.title
+            MoveStatus.NOT_FOUND, f"{file.value_id}.*", request_title, file.title
         )
 
     internal_filename = src.name
     ext = src.suffix
     if ext.lstrip(".") not in config.allowed_exts:
-        return MoveResult(
-            MoveStatus.SKIP, internal_filename, request_title, value.title
-        )
+        return MoveResult(MoveStatus.SKIP, internal_filename, request_title, file.title)
 
     data = dict(request_data)
     data.update(extra_data)
@@ -111,47 +113,52 @@ def move_value_file(
     data["info"] = (data.get("info") or "[noinfo]")[: config.max_title_length]
     data = sanitize_data(data)
 
-    raw_path = format_template(config.filename_template, data) + f"_{value.id}{ext}"
+    raw_path = filename_template.render(data) + f"_{file.value_id}{ext}"
     dst = resolve_destination(raw_path, output_dir)
 
     if not dst.exists() and not config.dry_run:
         dst.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy(src, dst)
 
-    return MoveResult(MoveStatus.OK, raw_path, request_title, value.title)
+    return MoveResult(MoveStatus.OK, raw_path, request_title, file.title)
 
 
 def move_files(
     input_dir: Path, output_dir: Path, session: Session, config: Config
 ) -> None:
     print("💻 Загружаем расписание и данные...")
-    if config.stage_mode:
-        plan_nodes = get_plan_nodes(session)
-        requests = [
-            node.request
-            for node in plan_nodes
-            if node.type is PlanNodeType.REQUEST and node.request is not None
-        ]
-    else:
-        requests = get_approved_requests(session)
-
+    with profile.stage("Загрузка данных"):
+        dataset = load_dataset(session)
+        # All files in one query, ordered by request, instead of scanning every
+        # value of every request for FILE/IMAGE ones.
+        files_by_request = {
+            request_id: list(files)
+            for request_id, files in groupby(
+                get_files(session), key=attrgetter("request_id")
+            )
+        }
+    rows = dataset.plan_requests if config.stage_mode else dataset.approved_requests()
     file_index = build_file_index(input_dir)
+    filename_template = compile_template(config.filename_template)
     results: list[MoveResult] = []
 
-    for idx, request in enumerate(
-        track(requests, description="🗃️ Проверяем и копируем файлы..."), 1
+    for idx, row in enumerate(
+        track(rows, description="🗃️ Проверяем и копируем файлы..."), 1
     ):
-        request_data = parse_request(request)
-        for value in iter_file_values(request, config):
-            extra_data = {"n": f"{idx:03}", "value_title": value.title}
-            result = move_value_file(
-                value,
-                request_data,
-                extra_data,
-                file_index.get(value.id),
-                output_dir=output_dir,
-                config=config,
-            )
+        request_data = dataset.request_data(row)
+        request_files = files_by_request.get(dataset.request_ids[row], ())
+        for file in iter_wanted_files(request_files, config):
+            extra_data = {"n": f"{idx:03}", "value_title": file.title}
+            with profile.stage("Копирование файла"):
+                result = move_value_file(
+                    file,
+                    request_data,
+                    extra_data,
+                    file_index.get(file.value_id),
+                    output_dir=output_dir,
+                    config=config,
+                    filename_template=filename_template,
+                )
             print(str(result))
             results.append(result)
 
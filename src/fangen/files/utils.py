@@ -2,23 +2,21 @@ import os
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from fangen.cosplay2.models.vo import ValueType
-
 if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator, Sequence
     from enum import StrEnum
 
     from fangen.config import Config
-    from fangen.db.models import Request, RequestValue
-
-FILE_VALUE_TYPES = {ValueType.FILE, ValueType.IMAGE}
+    from fangen.db.models import RequestFile
 
 
-def iter_file_values(request: Request, config: Config) -> Iterator[RequestValue]:
-    """Yield the file/image values of a request that should be processed."""
-    for value in request.values:
-        if value.type in FILE_VALUE_TYPES and value.title not in config.skip_fields:
-            yield value
+def iter_wanted_files(
+    files: Iterable[RequestFile], config: Config
+) -> Iterator[RequestFile]:
+    """Yield the files that should be processed, skipping ``skip_fields``."""
+    for file in files:
+        if file.title not in config.skip_fields:
+            yield file
 
 
 def build_file_index(directory: Path) -> dict[int, Path]:
@@ -0,0 +1,131 @@
+"""Every command runs as many SQL statements on a large event as on a small one.
+
+A lazy load or a query per row makes the count grow with the number of
+requests, so each command is run on synthetic events of two sizes.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Self
+
+import pytest
+from sqlalchemy import Engine, event, select
+
+from fangen.bench.pipeline import PipelineRun
+from fangen.bench.synthetic import generate_event
+from fangen.db.factory import get_session
+from fangen.db.models import RequestFile
+from fangen.excel.flat import make_flat_data
+from fangen.excel.update_data import make_data, write_topic_workbook
+from fangen.files.download_files import download_files
+
+# A small and a large event.
+SIZES = (200, 1000)
+
+
+class StatementCounter:
+    """Counts the statements executed on every engine while it is entered."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def _count(self, *_args: object) -> None:
+        self.count += 1
+
+    def __enter__(self) -> Self:
+        event.listen(Engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        event.remove(Engine, "before_cursor_execute", self._count)
+
+
+def _make_data_split(run: PipelineRun) -> None:
+    # Only the statements of this process are counted here: what a worker
+    # runs for its topic workbook is counted by _write_topic_workbook.
+    with get_session(db_path=run.db_path, read_only=True) as session:
+        make_data(
+            run.workdir / "split.xlsx",
+            session=session,
+            config=run.config,
+            split=True,
+            workers=1,
+        )
+
+
+def _write_topic_workbook(run: PipelineRun) -> None:
+    write_topic_workbook(1, run.workdir / "topic.xlsx", run.config)
+
+
+def _make_flat_data(output_format: str) -> Callable[[PipelineRun], None]:
+    def make(run: PipelineRun) -> None:
+        with get_session(db_path=run.db_path, read_only=True) as session:
+            make_flat_data(
+                run.workdir / f"data.{output_format}", session, output_format
+            )
+
+    return make
+
+
+def _prepare_downloads(run: PipelineRun) -> None:
+    """Put every file in place, newer than its request, so none is fetched."""
+    downloads = run.workdir / "downloads"
+    downloads.mkdir(exist_ok=True)
+    stmt = select(RequestFile.value_id, RequestFile.fileext)
+    with get_session(db_path=run.db_path, read_only=True) as session:
+        for value_id, ext in session.execute(stmt):
+            (downloads / f"{value_id}.{ext or 'jpg'}").touch()
+
+
+def _download_files(run: PipelineRun) -> None:
+    with get_session(db_path=run.db_path, read_only=True) as session:
+        download_files(run.workdir / "downloads", session=session, config=run.config)
+
+
+@dataclass(frozen=True, slots=True)
+class Command:
+    run: Callable[[PipelineRun], None]
+    # Puts the input files in place; its statements are not counted.
+    prepare: Callable[[PipelineRun], None] | None = None
+
+
+COMMANDS = {
+    "make_plan": Command(PipelineRun.make_plan),
+    "make_data": Command(PipelineRun.make_data),
+    "make_data --split": Command(_make_data_split),
+    "make_data --split, topic workbook": Command(_write_topic_workbook),
+    "make_data --format csv": Command(_make_flat_data("csv")),
+    "make_data --format jsonl": Command(_make_flat_data("jsonl")),
+    "download_files": Command(_download_files, prepare=_prepare_downloads),
+    "move_files": Command(PipelineRun.move_files, prepare=PipelineRun.prepare_files),
+}
+
+
+@pytest.fixture(scope="module")
+def runs(tmp_path_factory: pytest.TempPathFactory) -> list[PipelineRun]:
+    """A synthetic event of every size in ``SIZES``, loaded into its database."""
+    runs = []
+    for size in SIZES:
+        run = PipelineRun(
+            generate_event(requests=size, seed=0),
+            tmp_path_factory.mktemp(f"event{size}"),
+        )
+        run.make_db()
+        runs.append(run)
+    return runs
+
+
+def count_statements(command: Command, run: PipelineRun) -> int:
+    if command.prepare is not None:
+        command.prepare(run)
+    with StatementCounter() as counter:
+        command.run(run)
+    return counter.count
+
+
+@pytest.mark.parametrize("name", COMMANDS)
+def test_statements_do_not_grow_with_requests(
+    name: str, runs: list[PipelineRun]
+) -> None:
+    small, large = (count_statements(COMMANDS[name], run) for run in runs)
+    assert small == large
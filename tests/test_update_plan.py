@@ -0,0 +1,59 @@
+"""``make_plan --update`` keeps what was added to a plan by hand."""
+
+from typing import TYPE_CHECKING
+
+import pytest
+from openpyxl import load_workbook
+
+from fangen.bench.pipeline import PipelineRun
+from fangen.bench.synthetic import generate_event
+from fangen.db.factory import get_session
+from fangen.excel.update_plan import KEY_HEADER, make_plan
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+HAND_ROW = "Перерыв 15 минут"
+
+
+@pytest.fixture
+def run(tmp_path: Path) -> PipelineRun:
+    run = PipelineRun(generate_event(requests=20, seed=0), tmp_path)
+    run.make_db()
+    return run
+
+
+def update_plan(run: PipelineRun, filepath: Path) -> None:
+    with get_session(db_path=run.db_path, read_only=True) as session:
+        make_plan([filepath], session=session, update=True)
+
+
+def sheet_rows(filepath: Path) -> list[tuple[object, ...]]:
+    sheet = load_workbook(filepath).active
+    assert sheet is not None
+    return list(sheet.iter_rows(min_row=2, values_only=True))
+
+
+def test_update_keeps_hand_inserted_row(run: PipelineRun, tmp_path: Path) -> None:
+    filepath = tmp_path / "plan.xlsx"
+    update_plan(run, filepath)
+
+    wb = load_workbook(filepath)
+    sheet = wb.active
+    assert sheet is not None
+    headers = [cell.value for cell in sheet[1]]
+    key = headers.index(KEY_HEADER)
+    # Between the second and third planned rows, without a key.
+    sheet.insert_rows(4)
+    sheet.cell(row=4, column=1, value=HAND_ROW)
+    wb.save(filepath)
+    before = sheet_rows(filepath)
+
+    update_plan(run, filepath)
+
+    after = sheet_rows(filepath)
+    assert after == before
+    assert after[2][0] == HAND_ROW
+    assert after[2][key] is None
+    assert after[1][key] is not None
+    assert after[3][key] is not None